@@ -0,0 +1,46 @@
+import asyncio
+from functools import partial
+
+from django.db import close_old_connections
+from django.http import HttpResponse
+
+from .executors import LazyExecutor
+from .middleware import track_queries
+
+executor = LazyExecutor('ASYNC_DB_WORKERS', 'async-db')
+
+
+def materialize(response):
+    if hasattr(response, 'render'):
+        response.render()
+    if not response.streaming:
+        return response
+    content = HttpResponse(
+        b''.join(response.streaming_content),
+        status=response.status_code
+    )
+    for header, value in response.items():
+        content[header] = value
+    return content
+
+
+def call_view(view, request, args, kwargs):
+    close_old_connections()
+    try:
+        with track_queries(request):
+            return materialize(view(request, *args, **kwargs))
+    finally:
+        close_old_connections()
+
+
+def async_view(view):
+    """Runs a DRF view in the bounded pool instead of the event loop."""
+
+    async def wrapper(request, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(
+            executor.get(), partial(call_view, view, request, args, kwargs)
+        )
+
+    wrapper.__name__ = view.__name__
+    wrapper.csrf_exempt = True
+    return wrapper
@@ -0,0 +1,129 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.permissions import SAFE_METHODS
+
+from .cache import bump_versions, get_version
+
+CREDENTIAL_FIELDS = ('password',)
+
+
+def get_user_version_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def get_token_cache_key(key):
+    return f'auth:token:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def get_user_fields():
+    return [
+        field.attname for field in get_user_model()._meta.concrete_fields
+        if field.attname not in CREDENTIAL_FIELDS
+    ]
+
+
+def make_snapshot(user):
+    return tuple(getattr(user, field) for field in get_user_fields())
+
+
+def restore_snapshot(snapshot):
+    return get_user_model().from_db(None, get_user_fields(), snapshot)
+
+
+class TokenCache:
+    """Bounded LRU of token owners with an optional shared cache tier."""
+
+    def __init__(self, size, ttl, shared=False):
+        self.size = size
+        self.ttl = ttl
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def is_current(self, entry):
+        user_id, _, expires, version = entry
+        if expires < time.monotonic():
+            return False
+        return not self.shared or version == get_version(
+            get_user_version_key(user_id)
+        )
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None and self.shared:
+            entry = cache.get(get_token_cache_key(key))
+            if entry is not None:
+                user_id, snapshot, version = entry
+                entry = (
+                    user_id, snapshot, time.monotonic() + self.ttl, version
+                )
+                self.store(key, entry)
+        if entry is None or not self.is_current(entry):
+            return None
+        return restore_snapshot(entry[1])
+
+    def store(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def set(self, key, user):
+        snapshot = make_snapshot(user)
+        version = None
+        if self.shared:
+            version = get_version(get_user_version_key(user.pk))
+            cache.set(
+                get_token_cache_key(key),
+                (user.pk, snapshot, version),
+                self.ttl
+            )
+        self.store(
+            key, (user.pk, snapshot, time.monotonic() + self.ttl, version)
+        )
+
+    def evict_user(self, user_id):
+        with self._lock:
+            for key in [key for key, entry in self._entries.items()
+                        if entry[0] == user_id]:
+                del self._entries[key]
+        if self.shared:
+            bump_versions([get_user_version_key(user_id)])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(
+    size=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL,
+    shared=settings.TOKEN_CACHE_SHARED
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    use_cache = True
+
+    def authenticate(self, request):
+        self.use_cache = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        user = token_cache.get(key) if self.use_cache else None
+        if user is not None:
+            return user, self.get_model()(key=key, user=user)
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user)
+        return user, token
@@ -0,0 +1,713 @@
+import asyncio
+import base64
+import io
+import math
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import count
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import AsyncClient, Client
+from django.test.utils import (CaptureQueriesContext, override_settings,
+                               setup_test_environment,
+                               teardown_test_environment)
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from recipes.models import Favorite, Recipe, RecipeTag, ShoppingCart
+from users.models import Follow
+
+from .async_views import executor as async_executor
+from .counters import COUNTERS
+from .images import decode_base64_image, image_executor, process_recipe_image
+from .ingredient_search import ingredient_index
+from .pdf import register_fonts, render_pdf
+from .ranking import refresh_scores
+from .recipe_matcher import match_recipes_in_database, recipe_matcher
+from .recipe_search import (get_words, rebuild_search_index, search_fallback,
+                            search_recipes)
+from .shopping_list import get_shopping_list
+from .tests.factories import (make_client, make_image, make_image_content,
+                              make_ingredients, make_recipes, make_tags,
+                              make_users)
+
+SCENARIOS = {}
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def scenario(name):
+    def decorator(func):
+        SCENARIOS[name] = func
+        return func
+    return decorator
+
+
+@contextmanager
+def benchmark_database(verbosity=0):
+    old_name = connection.settings_dict['NAME']
+    setup_test_environment()
+    connection.creation.create_test_db(
+        verbosity=verbosity,
+        autoclobber=True,
+        serialize=False
+    )
+    try:
+        with tempfile.TemporaryDirectory() as media_root:
+            with override_settings(
+                MEDIA_ROOT=media_root,
+                IMAGE_WORKERS=0,
+                CACHES={'default': {
+                    'BACKEND':
+                        'django.core.cache.backends.locmem.LocMemCache',
+                    'LOCATION': 'benchmark',
+                }}
+            ):
+                try:
+                    yield
+                finally:
+                    image_executor.shutdown()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        teardown_test_environment()
+
+
+def reset_database():
+    call_command('flush', interactive=False, verbosity=0)
+    cache.clear()
+    ingredient_index.invalidate()
+    recipe_matcher.invalidate()
+
+
+@contextmanager
+def measure(memory=False):
+    result = {}
+    if memory:
+        tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            yield result
+            result['time_ms'] = round(
+                (time.perf_counter() - start) * 1000, 3
+            )
+        result['queries'] = len(queries)
+        if memory:
+            result['peak_memory_kb'] = round(
+                tracemalloc.get_traced_memory()[1] / 1024, 1
+            )
+    finally:
+        if memory:
+            tracemalloc.stop()
+
+
+def assert_constant_queries(results, label):
+    counts = {result['queries'] for result in results}
+    if len(counts) > 1:
+        raise BenchmarkError(
+            f'{label}: query count grows with input size: {results}'
+        )
+
+
+@scenario('shopping_list')
+def shopping_list_scenario(sizes=(1, 10, 30)):
+    user, author = make_users(2, prefix='shopper')
+    ingredients = make_ingredients(50)
+    results = []
+    for size in sizes:
+        ShoppingCart.objects.filter(user=user).delete()
+        ShoppingCart.objects.bulk_create(
+            ShoppingCart(user=user, recipe=recipe)
+            for recipe in make_recipes(author, size, ingredients, 10)
+        )
+        with measure() as result:
+            rows = list(get_shopping_list(user))
+        result.update(cart_size=size, rows=len(rows))
+        results.append(result)
+    assert_constant_queries(results, 'shopping_list')
+    return results
+
+
+@scenario('recipe_list')
+def recipe_list_scenario(sizes=(1, 6, 30)):
+    user, author = make_users(2, prefix='reader')
+    ingredients = make_ingredients(50)
+    tags = make_tags(3)
+    recipes = make_recipes(author, max(sizes), ingredients, 10)
+    RecipeTag.objects.bulk_create(
+        RecipeTag(recipe=recipe, tag=tag)
+        for recipe in recipes
+        for tag in tags
+    )
+    Favorite.objects.bulk_create(
+        Favorite(user=user, recipe=recipe) for recipe in recipes[::2]
+    )
+    client = make_client(user)
+    results = []
+    for size in sizes:
+        with measure() as result:
+            response = client.get('/api/recipes/', {'limit': size})
+        if response.status_code != 200:
+            raise BenchmarkError(
+                f'recipe_list: unexpected status {response.status_code}'
+            )
+        result.update(page_size=size)
+        results.append(result)
+    assert_constant_queries(results, 'recipe_list')
+    return results
+
+
+@scenario('subscriptions')
+def subscriptions_scenario(sizes=(1, 6, 30)):
+    user, *authors = make_users(max(sizes) + 1, prefix='follower')
+    ingredients = make_ingredients(10)
+    for author in authors:
+        make_recipes(author, 5, ingredients, 1)
+    Follow.objects.bulk_create(
+        Follow(user=user, author=author) for author in authors
+    )
+    client = make_client(user)
+    results = []
+    for size in sizes:
+        with measure() as result:
+            response = client.get(
+                '/api/users/subscriptions/',
+                {'limit': size, 'recipes_limit': 3}
+            )
+        if response.status_code != 200:
+            raise BenchmarkError(
+                f'subscriptions: unexpected status {response.status_code}'
+            )
+        result.update(page_size=size)
+        results.append(result)
+    assert_constant_queries(results, 'subscriptions')
+    return results
+
+
+@scenario('recipe_write')
+def recipe_write_scenario(sizes=(2, 10, 20, 50)):
+    author, = make_users(1, prefix='writer')
+    ingredients = make_ingredients(max(sizes) * 2)
+    tags = make_tags(3)
+    client = make_client(author)
+    image = make_image()
+    results = []
+    for size in sizes:
+        payload = {
+            'name': f'рецепт {size}',
+            'text': 'текст',
+            'cooking_time': 10,
+            'image': image,
+            'tags': [tag.id for tag in tags],
+            'ingredients': [
+                {'id': ingredient.id, 'amount': 1}
+                for ingredient in ingredients[:size]
+            ],
+        }
+        with measure() as created:
+            response = client.post('/api/recipes/', payload, format='json')
+        if response.status_code != 201:
+            raise BenchmarkError(
+                f'recipe_write: unexpected status {response.status_code}'
+            )
+        recipe_id = response.json()['id']
+        payload['tags'] = [tag.id for tag in tags[1:]]
+        payload['ingredients'] = [
+            {'id': ingredient.id, 'amount': 2}
+            for ingredient in ingredients[size // 2:size + size // 2]
+        ]
+        with measure() as updated:
+            response = client.put(
+                f'/api/recipes/{recipe_id}/', payload, format='json'
+            )
+        if response.status_code != 200:
+            raise BenchmarkError(
+                f'recipe_write: unexpected status {response.status_code}'
+            )
+        results.append({
+            'ingredients': size,
+            'create': created,
+            'update': updated,
+        })
+    assert_constant_queries(
+        [result['create'] for result in results], 'recipe_write create'
+    )
+    assert_constant_queries(
+        [result['update'] for result in results], 'recipe_write update'
+    )
+    return results
+
+
+@scenario('image_processing')
+def image_processing_scenario(sizes=((640, 480), (2000, 1500), (4000, 3000))):
+    author, = make_users(1, prefix='photographer')
+    results = []
+    for size in sizes:
+        Recipe.objects.bulk_create([Recipe(
+            author=author,
+            name='рецепт',
+            image=default_storage.save(
+                'recipes/images/image.jpeg',
+                ContentFile(make_image_content(size, 'JPEG'))
+            ),
+            text='текст',
+            cooking_time=10
+        )])
+        recipe = Recipe.objects.filter(author=author).latest('id')
+        with measure(memory=True) as result:
+            process_recipe_image(recipe.id, recipe.image.name)
+        recipe.refresh_from_db()
+        if not recipe.image_variants.get('variants'):
+            raise BenchmarkError('image_processing: variants were not saved')
+        result.update(width=size[0], height=size[1])
+        results.append(result)
+    return results
+
+
+@scenario('image_upload')
+def image_upload_scenario(sizes=((640, 480), (1200, 900), (1800, 1500))):
+    results = []
+    for width, height in sizes:
+        buffer = io.BytesIO()
+        Image.frombytes(
+            'RGB', (width, height), os.urandom(width * height * 3)
+        ).save(buffer, format='PNG')
+        data = 'data:image/png;base64,' + base64.b64encode(
+            buffer.getvalue()
+        ).decode()
+        del buffer
+        with measure(memory=True) as result:
+            with decode_base64_image(data) as image:
+                result['size_kb'] = round(image.size / 1024, 1)
+        result.update(width=width, height=height)
+        results.append(result)
+    return results
+
+
+@scenario('ingredient_search')
+def ingredient_search_scenario(queries=('и', 'ингредиент 1', '99', 'нет')):
+    make_ingredients(2200)
+    ingredient_index.invalidate()
+    ingredient_index.get_snapshot()
+    results = []
+    for query in queries:
+        with measure() as result:
+            matches = ingredient_index.search(query, limit=10)
+        result.update(query=query, matches=len(matches))
+        results.append(result)
+    if any(result['queries'] for result in results):
+        raise BenchmarkError(
+            f'ingredient_search: index lookups hit the database: {results}'
+        )
+    return results
+
+
+@scenario('pdf')
+def pdf_scenario(sizes=(10, 100, 1000)):
+    register_fonts()
+    results = []
+    for size in sizes:
+        lines = (f'- ингредиент {number} (г) - {number}'
+                 for number in range(size))
+        with measure(memory=True) as result:
+            with render_pdf(lines) as output:
+                output.seek(0, io.SEEK_END)
+                result['size_kb'] = round(output.tell() / 1024, 1)
+        result.update(lines=size)
+        results.append(result)
+    return results
+
+
+@scenario('recipe_paging')
+def recipe_paging_scenario(recipes=300, page_size=6):
+    user, author = make_users(2, prefix='pager')
+    make_recipes(author, recipes, make_ingredients(10), 1)
+    client = make_client(user)
+    last_page = recipes // page_size
+    with measure() as page_number:
+        client.get('/api/recipes/', {'limit': page_size, 'page': last_page})
+    url = f'/api/recipes/?cursor=&limit={page_size}'
+    for _ in range(last_page - 1):
+        url = client.get(url).json()['next']
+    with measure() as cursor:
+        client.get(url)
+    return {'page': last_page, 'page_number': page_number, 'cursor': cursor}
+
+
+@scenario('recipe_search')
+def recipe_search_scenario(recipes=2000,
+                           queries=('рецепт 1', 'ингредиент 7', 'текст',
+                                    'нет такого')):
+    make_dataset(20, recipes, 8, 0, 0)
+    results = {}
+    for query in queries:
+        queryset = Recipe.objects.only('id')
+        with measure() as indexed:
+            found = list(search_recipes(queryset, query)[:6])
+        with measure() as scanned:
+            list(search_fallback(queryset, get_words(query)).order_by(
+                '-publication_date', '-id'
+            )[:6])
+        results[query] = {
+            'found': len(found),
+            'total': search_recipes(queryset, query).count(),
+            'index_ms': indexed['time_ms'],
+            'scan_ms': scanned['time_ms'],
+        }
+    return {'recipes': recipes, 'database': connection.vendor,
+            'queries': results}
+
+
+@scenario('recipe_match')
+def recipe_match_scenario(recipes=2000, sizes=(5, 20, 50), coverage=50):
+    _, ingredients, _ = make_dataset(20, recipes, 8, 0, 0)
+    recipe_matcher.invalidate()
+    with measure() as build:
+        recipe_matcher.get_snapshot()
+    results = {}
+    for size in sizes:
+        pantry = [ingredient.id for ingredient in ingredients[:size]]
+        with measure() as indexed:
+            matches = recipe_matcher.match(pantry, coverage)
+        with measure() as joined:
+            expected = match_recipes_in_database(pantry, coverage)
+        if matches != expected:
+            raise BenchmarkError(
+                f'recipe_match {size}: index and database results differ'
+            )
+        results[size] = {
+            'matches': len(matches),
+            'index_ms': indexed['time_ms'],
+            'database_ms': joined['time_ms'],
+        }
+    return {
+        'recipes': recipes,
+        'coverage': coverage,
+        'build_ms': build['time_ms'],
+        'ingredients': results,
+    }
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def make_dataset(users, recipes, ingredients_per_recipe, favorites, follows,
+                 seed=0):
+    rng = random.Random(seed)
+    people = make_users(users, prefix='load')
+    ingredients = make_ingredients(max(ingredients_per_recipe * 20, 100))
+    tags = make_tags(3)
+    per_author, extra = divmod(recipes, users)
+    for number, author in enumerate(people):
+        count = per_author + (number < extra)
+        if count:
+            make_recipes(author, count, ingredients, ingredients_per_recipe)
+    recipe_ids = list(Recipe.objects.values_list('id', flat=True))
+    RecipeTag.objects.bulk_create(
+        RecipeTag(recipe_id=recipe_id, tag=tags[recipe_id % len(tags)])
+        for recipe_id in recipe_ids
+    )
+    Favorite.objects.bulk_create(
+        Favorite(user=user, recipe_id=recipe_id)
+        for user in people
+        for recipe_id in rng.sample(
+            recipe_ids, min(favorites, len(recipe_ids))
+        )
+    )
+    ShoppingCart.objects.bulk_create(
+        ShoppingCart(user=user, recipe_id=recipe_id)
+        for user in people
+        for recipe_id in rng.sample(recipe_ids, min(10, len(recipe_ids)))
+    )
+    Follow.objects.bulk_create(
+        Follow(user=user, author=author)
+        for user in people
+        for author in rng.sample(
+            [author for author in people if author != user],
+            min(follows, users - 1)
+        )
+    )
+    for counter in COUNTERS:
+        counter.repair()
+    refresh_scores()
+    rebuild_search_index()
+    return people, ingredients, tags
+
+
+def run_requests(label, request, iterations, expected_status=200):
+    timings = []
+    for _ in range(iterations):
+        cache.clear()
+        with measure() as result:
+            response = request()
+            if response.streaming:
+                b''.join(response.streaming_content)
+        if response.status_code != expected_status:
+            raise BenchmarkError(
+                f'api {label}: unexpected status {response.status_code}'
+            )
+        timings.append(result)
+    cache.clear()
+    with measure(memory=True) as result:
+        request()
+    times = [timing['time_ms'] for timing in timings]
+    return {
+        'requests': iterations,
+        'p50_ms': percentile(times, 0.5),
+        'p95_ms': percentile(times, 0.95),
+        'max_ms': max(times),
+        'queries': max(timing['queries'] for timing in timings),
+        'peak_memory_kb': result['peak_memory_kb'],
+    }
+
+
+@scenario('api')
+def api_scenario(users=50, recipes=500, ingredients_per_recipe=8,
+                 favorites=20, follows=10, iterations=20):
+    people, ingredients, tags = make_dataset(
+        users, recipes, ingredients_per_recipe, favorites, follows
+    )
+    user = people[0]
+    client = make_client(user)
+    reads = {
+        'recipes': ('/api/recipes/', {}),
+        'recipes_tags': ('/api/recipes/', {
+            'tags': [tag.slug for tag in tags[:2]]
+        }),
+        'recipes_author': ('/api/recipes/', {'author': people[1].id}),
+        'recipes_favorited': ('/api/recipes/', {'is_favorited': 1}),
+        'recipes_in_shopping_cart': (
+            '/api/recipes/', {'is_in_shopping_cart': 1}
+        ),
+        'recipes_popular': ('/api/recipes/', {'ordering': 'popular'}),
+        'recipes_cursor': ('/api/recipes/', {'cursor': ''}),
+        'subscriptions': (
+            '/api/users/subscriptions/', {'recipes_limit': 3}
+        ),
+        'ingredient_search': ('/api/ingredients/', {'name': 'ингредиент 1'}),
+        'recipes_search': ('/api/recipes/', {'search': 'рецепт ингредиент'}),
+        'recipes_match': ('/api/recipes/match/', {
+            'ingredients': [ingredient.id for ingredient in ingredients[:20]],
+            'coverage': 50,
+        }),
+        'download_shopping_cart': (
+            '/api/recipes/download_shopping_cart/', {'format': 'txt'}
+        ),
+    }
+    results = {
+        label: run_requests(
+            label,
+            lambda url=url, params=params: client.get(url, params),
+            iterations
+        )
+        for label, (url, params) in reads.items()
+    }
+    image = make_image()
+    numbers = count()
+
+    def payload():
+        chosen = ingredients[:ingredients_per_recipe]
+        return {
+            'name': f'нагрузка {next(numbers)}',
+            'text': 'текст',
+            'cooking_time': 10,
+            'image': image,
+            'tags': [tag.id for tag in tags],
+            'ingredients': [
+                {'id': ingredient.id, 'amount': 1} for ingredient in chosen
+            ],
+        }
+
+    results['recipe_create'] = run_requests(
+        'recipe_create',
+        lambda: client.post('/api/recipes/', payload(), format='json'),
+        iterations,
+        expected_status=201
+    )
+    recipe_id = Recipe.objects.filter(author=user).latest('id').id
+    results['recipe_update'] = run_requests(
+        'recipe_update',
+        lambda: client.put(
+            f'/api/recipes/{recipe_id}/', payload(), format='json'
+        ),
+        iterations
+    )
+    return {
+        'dataset': {
+            'users': users,
+            'recipes': Recipe.objects.count(),
+            'ingredients_per_recipe': ingredients_per_recipe,
+            'favorites': Favorite.objects.count(),
+            'follows': Follow.objects.count(),
+            'database': connection.vendor,
+        },
+        'endpoints': results,
+    }
+
+
+def get_connection_modes():
+    wrapper_class = type(connections[DEFAULT_DB_ALIAS])
+    modes = {
+        'none': (wrapper_class, 0, False),
+        'persistent': (wrapper_class, None, False),
+        'persistent_health_checks': (wrapper_class, None, True),
+    }
+    if connection.vendor == 'postgresql':
+        from foodgram.pooled_postgresql.base import DatabaseWrapper
+
+        modes['pool'] = (DatabaseWrapper, 0, False)
+    return modes
+
+
+@scenario('connections')
+def connections_scenario(requests=200):
+    make_tags(3)
+    results = {}
+    for mode, (wrapper_class, max_age, health_checks) in (
+        get_connection_modes().items()
+    ):
+        wrapper = wrapper_class(
+            {**connection.settings_dict, 'CONN_MAX_AGE': max_age},
+            alias=f'benchmark_{mode}'
+        )
+        start = time.perf_counter()
+        for _ in range(requests):
+            wrapper.close_if_unusable_or_obsolete()
+            if health_checks and wrapper.connection is not None:
+                wrapper.health_check_pending = True
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT COUNT(*) FROM recipes_tag')
+                cursor.fetchone()
+            wrapper.close_if_unusable_or_obsolete()
+        elapsed = time.perf_counter() - start
+        wrapper.close()
+        results[mode] = {
+            'requests': requests,
+            'requests_per_second': round(requests / elapsed, 1),
+        }
+    if 'pool' in results:
+        from foodgram.pooled_postgresql.base import close_pools
+
+        close_pools()
+    return results
+
+
+def wsgi_load(url, params, headers, requests, concurrency):
+    def send(_):
+        start = time.perf_counter()
+        response = Client().get(url, params, **headers)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response.status_code, (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(send, range(requests)))
+
+
+async def asgi_load(url, params, headers, requests, concurrency):
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(url, params, **headers)
+            return response.status_code, (time.perf_counter() - start) * 1000
+
+    return await asyncio.gather(*(send() for _ in range(requests)))
+
+
+def run_load(label, load):
+    cache.clear()
+    start = time.perf_counter()
+    results = load()
+    elapsed = time.perf_counter() - start
+    statuses = {status for status, _ in results if status != 200}
+    if statuses:
+        raise BenchmarkError(
+            f'asgi {label}: unexpected status {min(statuses)}'
+        )
+    times = [duration for _, duration in results]
+    return {
+        'requests_per_second': round(len(results) / elapsed, 1),
+        'p50_ms': round(percentile(times, 0.5), 3),
+        'p95_ms': round(percentile(times, 0.95), 3),
+    }
+
+
+@scenario('asgi')
+def asgi_scenario(users=20, recipes=100, requests=200, concurrency=20):
+    people, _, _ = make_dataset(users, recipes, 8, 10, 5)
+    token = Token.objects.create(user=people[0]).key
+    reads = {
+        'tags': ('/api/tags/', {}),
+        'ingredient_search': ('/api/ingredients/', {'name': 'ингредиент 1'}),
+        'recipe_detail': (
+            f'/api/recipes/{Recipe.objects.latest("id").id}/', {}
+        ),
+        'download_shopping_cart': (
+            '/api/recipes/download_shopping_cart/', {'format': 'pdf'}
+        ),
+    }
+    results = {}
+    for label, (url, params) in reads.items():
+        results[label] = {'wsgi': run_load(label, lambda: wsgi_load(
+            url, params, {'HTTP_AUTHORIZATION': f'Token {token}'},
+            requests, concurrency
+        ))}
+        with override_settings(ROOT_URLCONF='foodgram.urls_asgi'):
+            results[label]['asgi'] = run_load(label, lambda: asyncio.run(
+                asgi_load(
+                    url, params, {'Authorization': f'Token {token}'},
+                    requests, concurrency
+                )
+            ))
+    async_executor.shutdown()
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'database': connection.vendor,
+        'endpoints': results,
+    }
+
+
+def flatten(value, path=''):
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = enumerate(value)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {path: value}
+    else:
+        return {}
+    values = {}
+    for key, item in items:
+        values.update(flatten(item, f'{path}.{key}' if path else str(key)))
+    return values
+
+
+def compare_reports(baseline, current):
+    old = flatten(baseline)
+    changes = []
+    for path, value in flatten(current).items():
+        if path not in old or old[path] == value:
+            continue
+        change = (
+            f'{(value - old[path]) / old[path] * 100:+.1f}%'
+            if old[path] else 'new'
+        )
+        changes.append(f'{path}: {old[path]} -> {value} ({change})')
+    return changes
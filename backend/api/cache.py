@@ -0,0 +1,194 @@
+import hashlib
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.http.response import HttpResponseBase
+from django.utils.http import parse_etags
+
+
+def new_version():
+    return time.time_ns()
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        version = new_version()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_versions(keys):
+    version = new_version()
+    cache.set_many({key: version for key in keys}, None)
+
+
+def make_etag(*parts):
+    digest = hashlib.md5(
+        ':'.join(str(part) for part in parts).encode()
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request, etag):
+    etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    return etag in etags or '*' in etags
+
+
+def cache_stream(key, chunks, timeout, max_size):
+    parts = []
+    size = 0
+    for chunk in chunks:
+        if parts is not None:
+            size += len(chunk)
+            parts.append(chunk)
+            if size > max_size:
+                parts = None
+        yield chunk
+    if parts is not None:
+        cache.set(key, b''.join(parts), timeout)
+
+
+class OnCommitBatch:
+    """Collects keys during a transaction and handles them once on commit."""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.local = threading.local()
+
+    def get_pending(self):
+        if not hasattr(self.local, 'keys'):
+            self.local.keys = set()
+        return self.local.keys
+
+    def add(self, *keys):
+        self.get_pending().update(keys)
+        registered = any(
+            func == self.flush for _, func in connection.run_on_commit
+        )
+        if not registered:
+            transaction.on_commit(self.flush)
+
+    def flush(self):
+        keys = self.get_pending()
+        self.local.keys = set()
+        if keys:
+            self.callback(keys)
+
+
+class SnapshotIndex:
+    """In-process snapshot rebuilt when invalidated or older than the TTL."""
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._built_at = 0
+
+    def load(self):
+        raise NotImplementedError
+
+    def invalidate(self):
+        self._snapshot = None
+
+    def build(self):
+        self._snapshot = self.load()
+        self._built_at = time.monotonic()
+        return self._snapshot
+
+    def is_expired(self):
+        return (
+            self.ttl is not None
+            and time.monotonic() - self._built_at > self.ttl
+        )
+
+    def get_snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is None or self.is_expired():
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None or self.is_expired():
+                    snapshot = self.build()
+        return snapshot
+
+
+def get_reference_version_key(name):
+    return f'reference:version:{name}'
+
+
+def invalidate_references(names):
+    bump_versions(get_reference_version_key(name) for name in names)
+
+
+def invalidate_reference(name):
+    invalidate_references([name])
+
+
+changed_references = OnCommitBatch(invalidate_references)
+
+
+def get_reference_cache(name, query):
+    version = get_version(get_reference_version_key(name))
+    return (
+        make_etag(name, version, query),
+        f'reference:{name}:{version}:{make_etag(query)}'
+    )
+
+
+def set_reference_headers(response, etag):
+    response['ETag'] = etag
+    response['Cache-Control'] = (
+        f'public, max-age={settings.REFERENCE_CACHE_MAX_AGE}'
+    )
+    response['Vary'] = 'Accept'
+    return response
+
+
+def reference_response(request, name, render,
+                       content_type='application/json'):
+    """Serves rendered content of a reference list from the cache."""
+    etag, key = get_reference_cache(name, request.query_params.urlencode())
+    if etag_matches(request, etag):
+        return set_reference_headers(HttpResponseNotModified(), etag)
+    content = cache.get(key)
+    if content is None:
+        content = render()
+        if isinstance(content, HttpResponseBase):
+            return content
+        cache.set(key, content, settings.REFERENCE_CACHE_TIMEOUT)
+    return set_reference_headers(
+        HttpResponse(content, content_type=content_type),
+        etag
+    )
+
+
+def cache_reference_response(name):
+    """Caches rendered JSON of a rarely changing list view."""
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.accepted_renderer.format != 'json':
+                return method(self, request, *args, **kwargs)
+
+            def render():
+                response = method(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                return request.accepted_renderer.render(
+                    response.data,
+                    request.accepted_media_type,
+                    self.get_renderer_context()
+                )
+
+            return reference_response(
+                request, name, render, request.accepted_media_type
+            )
+        return wrapper
+    return decorator
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    if settings.CACHE_IS_SHARED:
+        return []
+    return [Warning(
+        'Кэш хранится в памяти процесса: сброс версий кэша в одном воркере '
+        'или в команде управления не виден остальным процессам.',
+        hint='Укажите общий CACHE_BACKEND (файловый, Redis или Memcached).',
+        id='api.W001',
+    )]
@@ -0,0 +1,73 @@
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_delete, post_save
+
+from recipes.models import Favorite, Recipe
+from users.models import Follow, User
+
+
+class Counter:
+    """Keeps target.field equal to the number of source rows pointing at it."""
+
+    def __init__(self, source, relation, target, field):
+        self.source = source
+        self.relation = relation
+        self.target = target
+        self.field = field
+
+    def __str__(self):
+        return f'{self.target._meta.label}.{self.field}'
+
+    def connect(self):
+        post_save.connect(
+            self.on_save, sender=self.source, dispatch_uid=f'{self}:save'
+        )
+        post_delete.connect(
+            self.on_delete, sender=self.source, dispatch_uid=f'{self}:delete'
+        )
+
+    def change(self, instance, delta):
+        self.target.objects.filter(
+            pk=getattr(instance, f'{self.relation}_id')
+        ).update(**{self.field: Greatest(F(self.field) + delta, 0)})
+
+    def on_save(self, sender, instance, created, **kwargs):
+        if created:
+            self.change(instance, 1)
+
+    def on_delete(self, sender, instance, **kwargs):
+        self.change(instance, -1)
+
+    def actual_count(self):
+        return Coalesce(
+            Subquery(
+                self.source.objects.filter(
+                    **{self.relation: OuterRef('pk')}
+                ).order_by().values(self.relation).annotate(
+                    count=Count('pk')
+                ).values('count')
+            ),
+            Value(0)
+        )
+
+    def drifted(self):
+        return self.target.objects.annotate(
+            actual=self.actual_count()
+        ).exclude(**{self.field: F('actual')})
+
+    def repair(self):
+        return self.target.objects.filter(
+            pk__in=self.drifted().values('pk')
+        ).update(**{self.field: self.actual_count()})
+
+
+COUNTERS = (
+    Counter(Favorite, 'recipe', Recipe, 'favorites_count'),
+    Counter(Recipe, 'author', User, 'recipes_count'),
+    Counter(Follow, 'author', User, 'followers_count'),
+)
+
+
+def connect_counters():
+    for counter in COUNTERS:
+        counter.connect()
@@ -0,0 +1,33 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+
+class LazyExecutor:
+    """Thread pool sized by a setting and started on first use."""
+
+    def __init__(self, workers_setting, thread_name_prefix):
+        self.workers_setting = workers_setting
+        self.thread_name_prefix = thread_name_prefix
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=getattr(settings, self.workers_setting),
+                        thread_name_prefix=self.thread_name_prefix
+                    )
+        return self._executor
+
+    def submit(self, func, *args):
+        return self.get().submit(func, *args)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
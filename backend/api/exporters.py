@@ -0,0 +1,92 @@
+import csv
+import json
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework import renderers
+
+from .pdf import render_pdf
+from .shopping_list import format_shopping_list
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ShoppingListExporter(renderers.BaseRenderer):
+    """Renderer that can also stream a shopping list row by row."""
+
+    charset = 'utf-8'
+    filename = 'shopping_cart'
+
+    def stream(self, rows):
+        raise NotImplementedError(
+            'ShoppingListExporter.stream() must be implemented.'
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b''.join(self.stream(data))
+
+    def get_content_type(self):
+        if self.charset:
+            return f'{self.media_type}; charset={self.charset}'
+        return self.media_type
+
+    def get_filename(self):
+        return f'{self.filename}.{self.format}'
+
+
+class PDFExporter(ShoppingListExporter):
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
+
+    def stream(self, rows):
+        with render_pdf(format_shopping_list(rows)) as output:
+            yield from iter(lambda: output.read(CHUNK_SIZE), b'')
+
+
+class TextExporter(ShoppingListExporter):
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def stream(self, rows):
+        for line in format_shopping_list(rows):
+            yield f'{line}\n'.encode(self.charset)
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+class CSVExporter(ShoppingListExporter):
+    media_type = 'text/csv'
+    format = 'csv'
+    fields = ('name', 'measurement_unit', 'amount')
+
+    def stream(self, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow(self.fields).encode(self.charset)
+        for row in rows:
+            yield writer.writerow(
+                [row[field] for field in self.fields]
+            ).encode(self.charset)
+
+
+class JSONExporter(ShoppingListExporter):
+    media_type = 'application/json'
+    format = 'json'
+
+    def stream(self, rows):
+        separator = '['
+        for row in rows:
+            yield (separator + json.dumps(
+                row, ensure_ascii=False
+            )).encode(self.charset)
+            separator = ','
+        yield b'[]' if separator == '[' else b']'
+
+
+def get_exporters():
+    return [
+        import_string(path) for path in settings.SHOPPING_LIST_EXPORTERS
+    ]
@@ -0,0 +1,75 @@
+import django_filters
+from django import forms
+from django.db.models import Exists, OuterRef, Value
+from django.db.models.functions import Coalesce
+from django_filters.widgets import BooleanWidget
+
+from recipes.models import Favorite, Recipe, RecipeTag, ShoppingCart
+
+from .recipe_search import search_recipes
+from .utils import relation_exists
+
+
+class MultipleValueField(forms.Field):
+    widget = forms.SelectMultiple
+
+    def to_python(self, value):
+        return [item for item in value or () if item]
+
+
+class MultipleValueFilter(django_filters.Filter):
+    field_class = MultipleValueField
+
+
+class RecipeFilter(django_filters.FilterSet):
+    author = django_filters.NumberFilter(field_name='author_id')
+    tags = MultipleValueFilter(method='filter_tags')
+    is_favorited = django_filters.BooleanFilter(
+        method='filter_relation',
+        widget=BooleanWidget
+    )
+    is_in_shopping_cart = django_filters.BooleanFilter(
+        method='filter_relation',
+        widget=BooleanWidget
+    )
+    search = django_filters.CharFilter(method='filter_search')
+
+    ordering = django_filters.ChoiceFilter(
+        choices=(('popular', 'popular'), ('trending', 'trending')),
+        method='order_by_score'
+    )
+
+    relation_models = {
+        'is_favorited': Favorite,
+        'is_in_shopping_cart': ShoppingCart,
+    }
+
+    class Meta:
+        model = Recipe
+        fields = ('author', 'tags', 'is_favorited', 'is_in_shopping_cart',
+                  'search', 'ordering')
+
+    def filter_tags(self, queryset, name, value):
+        if not value:
+            return queryset
+        return queryset.filter(Exists(RecipeTag.objects.filter(
+            recipe=OuterRef('pk'),
+            tag__slug__in=value
+        )))
+
+    def filter_relation(self, queryset, name, value):
+        condition = relation_exists(
+            self.relation_models[name],
+            self.request.user
+        )
+        if value:
+            return queryset.filter(condition)
+        return queryset.exclude(condition)
+
+    def filter_search(self, queryset, name, value):
+        return search_recipes(queryset, value)
+
+    def order_by_score(self, queryset, name, value):
+        return queryset.annotate(
+            score_value=Coalesce(f'score__{value}', Value(0.0))
+        ).order_by('-score_value', '-publication_date', '-id')
@@ -0,0 +1,185 @@
+import base64
+import binascii
+import io
+import logging
+import posixpath
+import tempfile
+
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from PIL import Image, ImageOps, JpegImagePlugin
+
+from recipes.models import Recipe
+
+from .executors import LazyExecutor
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = 'recipes/images/variants'
+DATA_URI_PREFIX = 'data:image/'
+BASE64_MARKER = ';base64,'
+BASE64_CHUNK_SIZE = 256 * 1024
+
+image_executor = LazyExecutor('IMAGE_WORKERS', 'images')
+
+
+def open_image(name):
+    with default_storage.open(name) as file:
+        image = Image.open(file)
+        animated = getattr(image, 'is_animated', False)
+        image.load()
+    return image, animated, ImageOps.exif_transpose(image)
+
+
+def get_save_params(image):
+    params = {
+        'format': image.format,
+        'icc_profile': image.info.get('icc_profile'),
+    }
+    if image.format == 'JPEG':
+        params.update(
+            qtables=image.quantization,
+            subsampling=JpegImagePlugin.get_sampling(image),
+            progressive='progressive' in image.info
+        )
+    elif image.format == 'WEBP':
+        params['quality'] = settings.IMAGE_WEBP_QUALITY
+    if 'transparency' in image.info:
+        params['transparency'] = image.info['transparency']
+    return params
+
+
+def save_stripped(name, original, animated, image):
+    if animated:
+        return name
+    buffer = io.BytesIO()
+    image.save(buffer, **get_save_params(original))
+    return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def save_variant(name, image, variant, size):
+    stem = posixpath.splitext(posixpath.basename(name))[0]
+    thumbnail = ImageOps.fit(
+        image.convert('RGBA' if 'A' in image.getbands() else 'RGB'),
+        size,
+        Image.LANCZOS
+    )
+    buffer = io.BytesIO()
+    thumbnail.save(
+        buffer, format='WEBP', quality=settings.IMAGE_WEBP_QUALITY
+    )
+    return default_storage.save(
+        f'{VARIANTS_DIR}/{stem}_{variant}.webp',
+        ContentFile(buffer.getvalue())
+    )
+
+
+def process_recipe_image(recipe_id, name):
+    """Strips metadata from a recipe image and renders its WebP variants."""
+    try:
+        original, animated, image = open_image(name)
+        stripped = save_stripped(name, original, animated, image)
+        variants = {
+            variant: save_variant(stripped, image, variant, size)
+            for variant, size in settings.RECIPE_IMAGE_VARIANTS.items()
+        }
+        previous = Recipe.objects.filter(pk=recipe_id).values_list(
+            'image_variants', flat=True
+        ).first() or {}
+        updated = Recipe.objects.filter(pk=recipe_id, image=name).update(
+            image=stripped,
+            image_variants={'source': stripped, 'variants': variants}
+        )
+        if updated:
+            obsolete = [name, *previous.get('variants', {}).values()]
+        else:
+            obsolete = [stripped, *variants.values()]
+        kept = stripped if updated else name
+        for path in obsolete:
+            if path != kept:
+                default_storage.delete(path)
+    except Exception:
+        logger.exception('Не удалось обработать изображение %s', name)
+    finally:
+        if settings.IMAGE_WORKERS:
+            connections.close_all()
+
+
+def schedule_image_processing(recipe):
+    recipe_id, name = recipe.pk, recipe.image.name
+    if settings.IMAGE_WORKERS:
+        transaction.on_commit(lambda: image_executor.submit(
+            process_recipe_image, recipe_id, name
+        ))
+    else:
+        transaction.on_commit(lambda: process_recipe_image(recipe_id, name))
+
+
+def needs_processing(recipe):
+    return bool(recipe.image) and (
+        recipe.image_variants.get('source') != recipe.image.name
+    )
+
+
+def get_image_variants(recipe, request=None):
+    if needs_processing(recipe):
+        return {}
+    urls = {}
+    for variant, path in recipe.image_variants.get('variants', {}).items():
+        url = default_storage.url(path)
+        urls[variant] = request.build_absolute_uri(url) if request else url
+    return urls
+
+
+def check_image_header(file):
+    file.seek(0)
+    try:
+        image = Image.open(file)
+    except (OSError, Image.DecompressionBombError):
+        raise ValueError('Файл не является изображением')
+    if image.format not in settings.IMAGE_UPLOAD_FORMATS:
+        raise ValueError('Неподдерживаемый формат изображения')
+    if image.width * image.height > settings.IMAGE_UPLOAD_MAX_PIXELS:
+        raise ValueError('Слишком большое разрешение изображения')
+    file.seek(0)
+    return image.format
+
+
+def verify_image(file):
+    format = check_image_header(file)
+    try:
+        Image.open(file).verify()
+    except Exception:
+        raise ValueError('Файл изображения повреждён')
+    file.seek(0)
+    return format
+
+
+def decode_base64_image(data):
+    """Decodes a data URI chunk by chunk into a spooled temporary file."""
+    marker = data.find(BASE64_MARKER, 0, 64)
+    if not data.startswith(DATA_URI_PREFIX) or marker == -1:
+        raise ValueError('Неверный формат изображения')
+    start = marker + len(BASE64_MARKER)
+    encoded_size = len(data) - start
+    if encoded_size // 4 * 3 > settings.IMAGE_UPLOAD_MAX_SIZE:
+        raise ValueError('Слишком большой размер изображения')
+    output = tempfile.SpooledTemporaryFile(
+        max_size=settings.IMAGE_UPLOAD_SPOOL_SIZE
+    )
+    try:
+        for offset in range(start, len(data), BASE64_CHUNK_SIZE):
+            chunk = data[offset:offset + BASE64_CHUNK_SIZE]
+            output.write(base64.b64decode(chunk, validate=True))
+            if offset == start:
+                check_image_header(output)
+                output.seek(0, io.SEEK_END)
+        format = verify_image(output)
+    except ValueError as error:
+        output.close()
+        if isinstance(error, binascii.Error):
+            raise ValueError('Неверный формат изображения')
+        raise
+    return File(output, name=f'image.{format.lower()}')
@@ -0,0 +1,81 @@
+import bisect
+from itertools import chain
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Value, When
+
+from recipes.models import Ingredient
+
+from .cache import SnapshotIndex
+
+
+class IngredientIndex(SnapshotIndex):
+    """In-process index of ingredient names sorted for prefix lookups."""
+
+    def load(self):
+        entries = sorted(
+            (name.lower(), pk, name, measurement_unit)
+            for pk, name, measurement_unit in Ingredient.objects.values_list(
+                'pk', 'name', 'measurement_unit'
+            )
+        )
+        return [entry[0] for entry in entries], entries
+
+    def search(self, query, limit=None):
+        query = query.strip().lower()
+        keys, entries = self.get_snapshot()
+        start = bisect.bisect_left(keys, query)
+        end = bisect.bisect_right(keys, query + '\uffff', lo=start)
+        matches = entries[start:end]
+        if limit is None or len(matches) < limit:
+            matches += [
+                entry for entry in chain(entries[:start], entries[end:])
+                if query in entry[0]
+            ]
+        return [
+            {'id': pk, 'name': name, 'measurement_unit': measurement_unit}
+            for _, pk, name, measurement_unit in matches[:limit]
+        ]
+
+
+ingredient_index = IngredientIndex(ttl=settings.INGREDIENT_SEARCH_INDEX_TTL)
+
+
+def search_ingredients_in_database(query, limit=None):
+    queryset = Ingredient.objects.annotate(
+        is_prefix=Case(
+            When(name__istartswith=query, then=Value(0)),
+            default=Value(1),
+            output_field=IntegerField()
+        )
+    )
+    ordering = ['is_prefix', 'name']
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        queryset = queryset.annotate(
+            similarity=TrigramSimilarity('name', query)
+        )
+        ordering = ['is_prefix', '-similarity', 'name']
+    return list(
+        queryset.filter(name__icontains=query).order_by(*ordering).values(
+            'id', 'name', 'measurement_unit'
+        )[:limit]
+    )
+
+
+def search_ingredients(query, limit=None):
+    if settings.INGREDIENT_SEARCH_INDEX:
+        return ingredient_index.search(query, limit)
+    return search_ingredients_in_database(query, limit)
+
+
+def get_ingredient_list(query_params):
+    name = query_params.get('name')
+    if not name:
+        return list(Ingredient.objects.values(
+            'id', 'name', 'measurement_unit'
+        ))
+    limit = query_params.get('limit', '')
+    return search_ingredients(name, int(limit) if limit.isdigit() else None)
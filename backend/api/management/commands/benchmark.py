@@ -0,0 +1,74 @@
+import inspect
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarks import (SCENARIOS, BenchmarkError, benchmark_database,
+                            compare_reports, reset_database)
+
+SCALE_OPTIONS = ('users', 'recipes', 'ingredients_per_recipe', 'favorites',
+                 'follows', 'iterations', 'requests', 'concurrency')
+
+
+class Command(BaseCommand):
+    help = ('Запускает сценарии нагрузки на отдельной тестовой базе '
+            'и выводит результаты в формате JSON')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'scenarios',
+            nargs='*',
+            help='Сценарии для запуска (по умолчанию все): '
+                 + ', '.join(sorted(SCENARIOS))
+        )
+        for option in SCALE_OPTIONS:
+            parser.add_argument(
+                f'--{option.replace("_", "-")}',
+                type=int,
+                help='Параметр синтетического набора данных'
+            )
+        parser.add_argument(
+            '--output',
+            help='Сохранить результаты в JSON-файл'
+        )
+        parser.add_argument(
+            '--compare',
+            help='Сравнить результаты с ранее сохранённым JSON-файлом'
+        )
+
+    def get_params(self, func, options):
+        accepted = inspect.signature(func).parameters
+        return {
+            option: options[option] for option in SCALE_OPTIONS
+            if options[option] is not None and option in accepted
+        }
+
+    def handle(self, *args, **options):
+        names = options['scenarios'] or sorted(SCENARIOS)
+        unknown = set(names) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные сценарии: {", ".join(sorted(unknown))}'
+            )
+        baseline = None
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                baseline = json.load(file)
+        report = {}
+        with benchmark_database(verbosity=options['verbosity'] - 1):
+            for name in names:
+                reset_database()
+                func = SCENARIOS[name]
+                try:
+                    report[name] = func(**self.get_params(func, options))
+                except BenchmarkError as error:
+                    raise CommandError(error)
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+        if baseline is not None:
+            for change in compare_reports(baseline, report):
+                self.stdout.write(change)
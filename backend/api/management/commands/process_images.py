@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from api.images import needs_processing, process_recipe_image
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии и WebP-варианты изображений рецептов'
+
+    def handle(self, *args, **options):
+        processed = 0
+        for recipe in Recipe.objects.only('id', 'image', 'image_variants'):
+            if needs_processing(recipe):
+                process_recipe_image(recipe.id, recipe.image.name)
+                processed += 1
+        self.stdout.write(f'Обработано изображений: {processed}')
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.counters import COUNTERS
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает денормализованные счётчики избранного, '
+            'рецептов и подписчиков')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только показать расхождения, ничего не исправляя'
+        )
+
+    def handle(self, *args, **options):
+        for counter in COUNTERS:
+            if options['check']:
+                drifted = counter.drifted().count()
+                self.stdout.write(f'{counter}: расхождений {drifted}')
+                continue
+            with transaction.atomic():
+                repaired = counter.repair()
+            self.stdout.write(f'{counter}: исправлено {repaired}')
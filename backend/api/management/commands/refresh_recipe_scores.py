@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.ranking import refresh_scores
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает рейтинги популярных и набирающих '
+            'популярность рецептов')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Пересчитывать рейтинги постоянно с заданным интервалом'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=settings.RANKING_REFRESH_INTERVAL,
+            help='Интервал между пересчётами в секундах'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Пересчитать рейтинги всех рецептов'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            result = refresh_scores(full=options['full'])
+            self.stdout.write(
+                f'{"Полный" if result["full"] else "Частичный"} пересчёт. '
+                f'Создано: {result["created"]}, '
+                f'обновлено: {result["updated"]}'
+            )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.recipe_search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс рецептов'
+
+    def handle(self, *args, **options):
+        count = rebuild_search_index()
+        self.stdout.write(f'Проиндексировано рецептов: {count}')
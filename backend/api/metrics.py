@@ -0,0 +1,103 @@
+import bisect
+import threading
+from collections import defaultdict
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = defaultdict(
+            lambda: {'counts': [0] * (len(buckets) + 1), 'sum': 0}
+        )
+
+    def observe(self, labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series[tuple(sorted(labels.items()))]
+            series['counts'][index] += 1
+            series['sum'] += value
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def collect(self):
+        with self._lock:
+            return {
+                labels: {'counts': list(series['counts']),
+                         'sum': series['sum']}
+                for labels, series in self._series.items()
+            }
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.description}',
+            f'# TYPE {self.name} histogram',
+        ]
+        for labels, series in sorted(self.collect().items()):
+            total = 0
+            bounds = [*(str(bucket) for bucket in self.buckets), '+Inf']
+            for bound, count in zip(bounds, series['counts']):
+                total += count
+                lines.append(
+                    f'{self.name}_bucket'
+                    f'{format_labels(labels + (("le", bound),))} {total}'
+                )
+            lines.append(
+                f'{self.name}_sum{format_labels(labels)} {series["sum"]}'
+            )
+            lines.append(f'{self.name}_count{format_labels(labels)} {total}')
+        return '\n'.join(lines)
+
+
+def escape_label(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace(
+        '\n', r'\n'
+    )
+
+
+def format_labels(labels):
+    return '{' + ','.join(
+        f'{name}="{escape_label(value)}"' for name, value in labels
+    ) + '}'
+
+
+REQUEST_DURATION = Histogram(
+    'foodgram_request_duration_seconds',
+    'Время обработки запроса',
+    DURATION_BUCKETS
+)
+DB_DURATION = Histogram(
+    'foodgram_request_db_duration_seconds',
+    'Время выполнения SQL-запросов за запрос',
+    DURATION_BUCKETS
+)
+DB_QUERIES = Histogram(
+    'foodgram_request_db_queries',
+    'Количество SQL-запросов за запрос',
+    QUERY_BUCKETS
+)
+RENDER_DURATION = Histogram(
+    'foodgram_request_render_duration_seconds',
+    'Время сериализации ответа',
+    DURATION_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    'foodgram_response_size_bytes',
+    'Размер ответа',
+    SIZE_BUCKETS
+)
+HISTOGRAMS = (
+    REQUEST_DURATION, DB_DURATION, DB_QUERIES, RENDER_DURATION, RESPONSE_SIZE
+)
+
+
+def render_metrics():
+    return '\n'.join(histogram.render() for histogram in HISTOGRAMS) + '\n'
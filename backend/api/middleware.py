@@ -0,0 +1,123 @@
+import asyncio
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import (DB_DURATION, DB_QUERIES, RENDER_DURATION,
+                      REQUEST_DURATION, RESPONSE_SIZE)
+
+
+class QueryTimer:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def get_view_name(view_func, method):
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return getattr(view_func, '__name__', 'unknown')
+    action = (getattr(view_func, 'actions', None) or {}).get(method.lower())
+    if action is None:
+        return view_class.__name__
+    return f'{view_class.__name__}.{action}'
+
+
+def track_queries(request):
+    stack = ExitStack()
+    timer = getattr(request, 'metrics_timer', None)
+    if timer is not None:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timer))
+    return stack
+
+
+class MetricsMiddleware:
+    """Records query count, DB time, render time and size per DRF view."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.start(request):
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            request.metrics_stack.close()
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        if not self.start(request):
+            return await self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            request.metrics_stack.close()
+        return self.finish(request, response)
+
+    def start(self, request):
+        if (not settings.METRICS_ENABLED
+                or random.random() >= settings.METRICS_SAMPLE_RATE):
+            return False
+        request.metrics_view = 'unmatched'
+        request.metrics_render = 0
+        request.metrics_timer = QueryTimer()
+        request.metrics_stack = ExitStack()
+        request.metrics_start = time.perf_counter()
+        return True
+
+    def finish(self, request, response):
+        duration = time.perf_counter() - request.metrics_start
+        timer = request.metrics_timer
+        labels = {
+            'view': request.metrics_view,
+            'method': request.method,
+            'status': response.status_code,
+        }
+        REQUEST_DURATION.observe(labels, duration)
+        DB_DURATION.observe(labels, timer.duration)
+        DB_QUERIES.observe(labels, timer.count)
+        RENDER_DURATION.observe(labels, request.metrics_render)
+        if not response.streaming:
+            RESPONSE_SIZE.observe(labels, len(response.content))
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={timer.duration * 1000:.1f};'
+            f'desc="SQL: {timer.count}"',
+            f'render;dur={request.metrics_render * 1000:.1f}',
+            f'total;dur={duration * 1000:.1f}',
+        ))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if hasattr(request, 'metrics_view'):
+            request.metrics_view = get_view_name(view_func, request.method)
+            request.metrics_stack.enter_context(track_queries(request))
+
+    def process_template_response(self, request, response):
+        if hasattr(request, 'metrics_view'):
+            start = time.perf_counter()
+
+            def finish_render(response):
+                request.metrics_render = time.perf_counter() - start
+
+            response.add_post_render_callback(finish_render)
+        return response
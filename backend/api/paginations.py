@@ -1,13 +1,144 @@
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
 from rest_framework import status
 from rest_framework.exceptions import NotFound as NotFoundError
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import (Cursor, CursorPagination,
+                                       PageNumberPagination)
 from rest_framework.response import Response
 
+UNIQUE_ORDERING = ('id', '-id', 'pk', '-pk')
+
+
+def reverse_ordering(ordering):
+    return tuple(
+        field[1:] if field.startswith('-') else f'-{field}'
+        for field in ordering
+    )
+
+
+def keyset_after(ordering, position):
+    conditions = []
+    for index, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        conditions.append(Q(
+            **{
+                previous.lstrip('-'): value
+                for previous, value in zip(ordering[:index], position)
+            },
+            **{f'{name}__{lookup}': position[index]}
+        ))
+    return reduce(or_, conditions)
+
+
+class CustomCursorPaginator(CursorPagination):
+    """Keyset pagination over every ordering field, not just the first."""
+
+    page_size = 6
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    ordering = ('-publication_date', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(queryset.query.order_by) or self.ordering
+        if ordering[-1] not in UNIQUE_ORDERING:
+            ordering += ('-id',)
+        return ordering
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+        try:
+            position = json.loads(cursor.position)
+        except ValueError:
+            raise NotFoundError(self.invalid_cursor_message)
+        if (not isinstance(position, list)
+                or len(position) != len(self.ordering)):
+            raise NotFoundError(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=cursor.reverse, position=position)
+
+    def encode_position(self, instance):
+        values = []
+        for field in self.ordering:
+            value = getattr(instance, field.lstrip('-'))
+            values.append(
+                value.isoformat() if hasattr(value, 'isoformat') else value
+            )
+        return json.dumps(values)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse, position = (
+            (False, None) if self.cursor is None else self.cursor[1:]
+        )
+        ordering = reverse_ordering(self.ordering) if reverse else (
+            self.ordering
+        )
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(keyset_after(ordering, position))
+        try:
+            results = list(queryset[:self.page_size + 1])
+        except (TypeError, ValueError, ValidationError):
+            raise NotFoundError(self.invalid_cursor_message)
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+        self.has_next = position is not None if reverse else has_more
+        self.has_previous = has_more if reverse else position is not None
+        if (self.has_previous or self.has_next) and self.template:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(Cursor(
+            offset=0, reverse=False,
+            position=self.encode_position(self.page[-1])
+        ))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(Cursor(
+            offset=0, reverse=True,
+            position=self.encode_position(self.page[0])
+        ))
+
 
 class CustomPaginator(PageNumberPagination):
     page_size = 6
     page_size_query_param = 'limit'
     page_query_param = 'page'
+    cursor_paginator_class = CustomCursorPaginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        cursor_query_param = self.cursor_paginator_class.cursor_query_param
+        if (cursor_query_param in request.query_params
+                and isinstance(queryset, QuerySet)):
+            self.cursor_paginator = self.cursor_paginator_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
 
     def generate_response(self, queryset, serializer_obj, request):
         try:
@@ -0,0 +1,39 @@
+import tempfile
+
+from django.conf import settings
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+FONT_NAME = 'FreeSans-LrmZ'
+FONT_PATH = settings.BASE_DIR / 'static' / 'FreeSans-LrmZ.ttf'
+FONT_SIZE = 16
+LINE_HEIGHT = 18
+MARGIN = 72
+SPOOL_MAX_SIZE = 1024 * 1024
+
+
+def register_fonts():
+    if FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont(FONT_NAME, str(FONT_PATH)))
+
+
+def render_pdf(lines, pagesize=A4):
+    register_fonts()
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    pdf = canvas.Canvas(output, pagesize=pagesize)
+    width, height = pagesize
+    y = height - MARGIN
+    pdf.setFont(FONT_NAME, FONT_SIZE)
+    for line in lines:
+        if y < MARGIN:
+            pdf.showPage()
+            pdf.setFont(FONT_NAME, FONT_SIZE)
+            y = height - MARGIN
+        pdf.drawString(MARGIN, y, line)
+        y -= LINE_HEIGHT
+    pdf.showPage()
+    pdf.save()
+    output.seek(0)
+    return output
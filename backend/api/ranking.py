@@ -0,0 +1,135 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from recipes.models import Favorite, Recipe, RecipeScore, ShoppingCart
+
+from .cache import OnCommitBatch
+
+BATCH_SIZE = 1000
+LAST_RUN_KEY = 'ranking:last_run'
+
+
+def get_weights():
+    return (
+        (Favorite, settings.RANKING_FAVORITE_WEIGHT),
+        (ShoppingCart, settings.RANKING_CART_WEIGHT),
+    )
+
+
+def get_popular_scores(recipe_ids=None):
+    scores = defaultdict(float)
+    favorites = Recipe.objects.filter(favorites_count__gt=0)
+    carts = ShoppingCart.objects.all()
+    if recipe_ids is not None:
+        favorites = favorites.filter(id__in=recipe_ids)
+        carts = carts.filter(recipe_id__in=recipe_ids)
+    for recipe_id, count in favorites.values_list('id', 'favorites_count'):
+        scores[recipe_id] += settings.RANKING_FAVORITE_WEIGHT * count
+    carts = carts.order_by().values('recipe').annotate(
+        count=Count('pk')
+    ).values_list('recipe', 'count')
+    for recipe_id, count in carts:
+        scores[recipe_id] += settings.RANKING_CART_WEIGHT * count
+    return scores
+
+
+def get_trending_since(now):
+    day = timezone.localdate(now) - timedelta(
+        days=settings.RANKING_TRENDING_DAYS
+    )
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def get_trending_scores(now, recipe_ids=None):
+    scores = defaultdict(float)
+    today = timezone.localdate(now)
+    half_life = settings.RANKING_TRENDING_HALF_LIFE_DAYS
+    for model, weight in get_weights():
+        events = model.objects.filter(created__gte=get_trending_since(now))
+        if recipe_ids is not None:
+            events = events.filter(recipe_id__in=recipe_ids)
+        events = events.annotate(
+            day=TruncDate('created')
+        ).order_by().values('recipe', 'day').annotate(
+            count=Count('pk')
+        ).values_list('recipe', 'day', 'count')
+        for recipe_id, day, count in events:
+            age = (today - day).days
+            scores[recipe_id] += weight * count * 0.5 ** (age / half_life)
+    return scores
+
+
+def take_active_recipe_ids(since):
+    dirty = RecipeScore.objects.filter(dirty=True)
+    recipe_ids = set(dirty.values_list('recipe_id', flat=True))
+    dirty.filter(recipe_id__in=recipe_ids).update(dirty=False)
+    for model, _ in get_weights():
+        recipe_ids.update(model.objects.filter(
+            created__gte=since
+        ).values_list('recipe_id', flat=True).distinct())
+    return recipe_ids
+
+
+def mark_scores_dirty(recipe_ids):
+    RecipeScore.objects.filter(recipe_id__in=recipe_ids).update(dirty=True)
+
+
+def refresh_scores(now=None, full=False):
+    """Recomputes scores changed since the last run, all of them daily."""
+    now = now or timezone.now()
+    last_run = cache.get(LAST_RUN_KEY)
+    full = full or last_run is None or (
+        timezone.localdate(last_run) != timezone.localdate(now)
+    )
+    if full:
+        RecipeScore.objects.filter(dirty=True).update(dirty=False)
+        recipe_ids = None
+    else:
+        recipe_ids = take_active_recipe_ids(last_run)
+    popular = get_popular_scores(recipe_ids)
+    trending = get_trending_scores(now, recipe_ids)
+    if full:
+        recipe_ids = popular.keys() | trending.keys() | set(
+            RecipeScore.objects.exclude(
+                popular=0, trending=0
+            ).values_list('recipe_id', flat=True)
+        )
+    existing = RecipeScore.objects.in_bulk(recipe_ids)
+    changed, created = [], []
+    for recipe_id in recipe_ids:
+        values = {
+            'popular': round(popular.get(recipe_id, 0), 6),
+            'trending': round(trending.get(recipe_id, 0), 6),
+        }
+        score = existing.get(recipe_id)
+        if score is None:
+            if any(values.values()):
+                created.append(RecipeScore(recipe_id=recipe_id, **values))
+        elif (score.popular, score.trending) != tuple(values.values()):
+            score.popular = values['popular']
+            score.trending = values['trending']
+            score.updated = now
+            changed.append(score)
+    with transaction.atomic():
+        RecipeScore.objects.bulk_update(
+            changed, ['popular', 'trending', 'updated'], BATCH_SIZE
+        )
+        RecipeScore.objects.bulk_create(
+            created, BATCH_SIZE, ignore_conflicts=True
+        )
+    cache.set(LAST_RUN_KEY, now, None)
+    return {
+        'created': len(created),
+        'updated': len(changed),
+        'full': full,
+    }
+
+
+changed_scores = OnCommitBatch(mark_scores_dirty)
@@ -0,0 +1,113 @@
+import bisect
+from array import array
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db.models import Count, F, Q
+
+from recipes.models import RecipeIngredient
+
+from .cache import OnCommitBatch, SnapshotIndex
+
+
+def get_recipe_ingredients(recipe_ids=None):
+    queryset = RecipeIngredient.objects.all()
+    if recipe_ids is not None:
+        queryset = queryset.filter(recipe_id__in=recipe_ids)
+    recipes = defaultdict(set)
+    for recipe_id, ingredient_id in queryset.values_list(
+        'recipe_id', 'ingredient_id'
+    ).iterator():
+        recipes[recipe_id].add(ingredient_id)
+    return recipes
+
+
+def rank_matches(matches):
+    return sorted(
+        matches,
+        key=lambda match: (-match[1] / match[2], match[2] - match[1],
+                           -match[0])
+    )
+
+
+class RecipeMatcher(SnapshotIndex):
+    """In-process inverted index from ingredient ids to sorted recipe ids."""
+
+    def load(self):
+        recipes = get_recipe_ingredients()
+        postings = defaultdict(list)
+        for recipe_id in sorted(recipes):
+            for ingredient_id in recipes[recipe_id]:
+                postings[ingredient_id].append(recipe_id)
+        return (
+            {
+                ingredient_id: array('q', recipe_ids)
+                for ingredient_id, recipe_ids in postings.items()
+            },
+            {
+                recipe_id: frozenset(ingredients)
+                for recipe_id, ingredients in recipes.items()
+            },
+        )
+
+    def update(self, recipe_ids):
+        current = get_recipe_ingredients(recipe_ids)
+        with self._lock:
+            if self._snapshot is None:
+                return
+            postings, recipes = self._snapshot
+            for recipe_id in recipe_ids:
+                old = recipes.get(recipe_id, frozenset())
+                new = frozenset(current.get(recipe_id, ()))
+                for ingredient_id in old - new:
+                    recipe_list = postings[ingredient_id]
+                    position = bisect.bisect_left(recipe_list, recipe_id)
+                    postings[ingredient_id] = (
+                        recipe_list[:position] + recipe_list[position + 1:]
+                    )
+                for ingredient_id in new - old:
+                    recipe_list = postings.get(ingredient_id, array('q'))
+                    position = bisect.bisect_left(recipe_list, recipe_id)
+                    postings[ingredient_id] = (
+                        recipe_list[:position] + array('q', [recipe_id])
+                        + recipe_list[position:]
+                    )
+                if new:
+                    recipes[recipe_id] = new
+                else:
+                    recipes.pop(recipe_id, None)
+
+    def match(self, ingredient_ids, coverage):
+        postings, recipes = self.get_snapshot()
+        counts = Counter()
+        for ingredient_id in set(ingredient_ids):
+            counts.update(postings.get(ingredient_id, ()))
+        matches = []
+        for recipe_id, matched in counts.items():
+            ingredients = recipes.get(recipe_id)
+            if ingredients and matched * 100 >= coverage * len(ingredients):
+                matches.append((recipe_id, matched, len(ingredients)))
+        return rank_matches(matches)
+
+
+recipe_matcher = RecipeMatcher(ttl=settings.RECIPE_MATCHER_INDEX_TTL)
+
+
+def match_recipes_in_database(ingredient_ids, coverage):
+    return rank_matches(RecipeIngredient.objects.values('recipe_id').annotate(
+        matched=Count('id', filter=Q(ingredient_id__in=ingredient_ids)),
+        total=Count('id'),
+        score=F('matched') * 100
+    ).filter(
+        matched__gt=0,
+        score__gte=F('total') * coverage
+    ).values_list('recipe_id', 'matched', 'total'))
+
+
+def match_recipes(ingredient_ids, coverage):
+    if settings.RECIPE_MATCHER_INDEX:
+        return recipe_matcher.match(ingredient_ids, coverage)
+    return match_recipes_in_database(ingredient_ids, coverage)
+
+
+changed_matcher_recipes = OnCommitBatch(recipe_matcher.update)
@@ -0,0 +1,152 @@
+import re
+from functools import reduce
+from operator import and_
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import (BooleanField, Exists, FloatField, OuterRef, Q,
+                              Value)
+from django.db.models.expressions import RawSQL
+
+from recipes.models import Recipe, RecipeIngredient
+
+from .cache import OnCommitBatch
+
+FTS_TABLE = 'recipes_recipe_search'
+WORD_RE = re.compile(r'[^\W_]+')
+MAX_WORDS = 10
+BATCH_SIZE = 500
+
+POSTGRESQL_UPDATE = '''
+    UPDATE recipes_recipe AS recipe SET search_vector =
+        setweight(to_tsvector(%(config)s::regconfig, recipe.name), 'A')
+        || setweight(to_tsvector(%(config)s::regconfig, coalesce((
+            SELECT string_agg(ingredient.name, ' ')
+            FROM recipes_recipeingredient AS item
+            JOIN recipes_ingredient AS ingredient
+                ON ingredient.id = item.ingredient_id
+            WHERE item.recipe_id = recipe.id
+        ), '')), 'B')
+        || setweight(to_tsvector(%(config)s::regconfig, recipe.text), 'C')
+    WHERE recipe.id = ANY(%(ids)s)
+'''
+
+SQLITE_INSERT = f'''
+    INSERT INTO {FTS_TABLE} (rowid, name, ingredients, text)
+    SELECT recipe.id, recipe.name, coalesce((
+        SELECT group_concat(ingredient.name, ' ')
+        FROM recipes_recipeingredient AS item
+        JOIN recipes_ingredient AS ingredient
+            ON ingredient.id = item.ingredient_id
+        WHERE item.recipe_id = recipe.id
+    ), ''), recipe.text
+    FROM recipes_recipe AS recipe
+    WHERE recipe.id IN ({{placeholders}})
+'''
+
+
+def get_words(query):
+    return WORD_RE.findall(query.lower())[:MAX_WORDS]
+
+
+def update_search_index(recipe_ids):
+    recipe_ids = list(recipe_ids)
+    with connection.cursor() as cursor:
+        for start in range(0, len(recipe_ids), BATCH_SIZE):
+            batch = recipe_ids[start:start + BATCH_SIZE]
+            if connection.vendor == 'postgresql':
+                cursor.execute(POSTGRESQL_UPDATE, {
+                    'config': settings.RECIPE_SEARCH_CONFIG,
+                    'ids': batch,
+                })
+            elif connection.vendor == 'sqlite':
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(
+                    f'DELETE FROM {FTS_TABLE} '
+                    f'WHERE rowid IN ({placeholders})',
+                    batch
+                )
+                cursor.execute(
+                    SQLITE_INSERT.format(placeholders=placeholders),
+                    batch
+                )
+
+
+def update_ingredient_recipes(ingredient_ids):
+    update_search_index(set(RecipeIngredient.objects.filter(
+        ingredient_id__in=ingredient_ids
+    ).values_list('recipe_id', flat=True)))
+
+
+def rebuild_search_index():
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    recipe_ids = list(Recipe.objects.values_list('id', flat=True))
+    update_search_index(recipe_ids)
+    return len(recipe_ids)
+
+
+def search_postgresql(queryset, words):
+    params = (
+        settings.RECIPE_SEARCH_CONFIG,
+        ' & '.join(f'{word}:*' for word in words)
+    )
+    query = 'to_tsquery(%s::regconfig, %s)'
+    return queryset.filter(RawSQL(
+        f'recipes_recipe.search_vector @@ {query}',
+        params,
+        output_field=BooleanField()
+    )).annotate(search_rank=RawSQL(
+        f'ts_rank(recipes_recipe.search_vector, {query})::float8',
+        params,
+        output_field=FloatField()
+    ))
+
+
+def search_sqlite(queryset, words):
+    params = (' AND '.join(f'("{word}" OR "{word}"*)' for word in words),)
+    materialized = (
+        'MATERIALIZED'
+        if connection.Database.sqlite_version_info >= (3, 35) else ''
+    )
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        params
+    )).annotate(search_rank=RawSQL(
+        f'WITH ranked AS {materialized} ('
+        f'SELECT rowid, -bm25({FTS_TABLE}, 1.0, 0.4, 0.2) AS rank '
+        f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+        ') SELECT rank FROM ranked WHERE rowid = recipes_recipe.id',
+        params,
+        output_field=FloatField()
+    ))
+
+
+def search_fallback(queryset, words):
+    return queryset.filter(reduce(and_, (
+        Exists(RecipeIngredient.objects.filter(
+            recipe=OuterRef('pk'),
+            ingredient__name__icontains=word
+        ))
+        | Q(name__icontains=word)
+        | Q(text__icontains=word)
+        for word in words
+    ))).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def search_recipes(queryset, query):
+    words = get_words(query)
+    if not words:
+        return queryset
+    search = {
+        'postgresql': search_postgresql,
+        'sqlite': search_sqlite,
+    }.get(connection.vendor, search_fallback)
+    return search(queryset, words).order_by(
+        '-search_rank', '-publication_date', '-id'
+    )
+
+
+changed_search_recipes = OnCommitBatch(update_search_index)
+changed_search_ingredients = OnCommitBatch(update_ingredient_recipes)
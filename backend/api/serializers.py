@@ -1,6 +1,8 @@
-import base64
+import json
 
-from django.core.files.base import ContentFile
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
 from djoser.serializers import UserCreateSerializer, UserSerializer
 from rest_framework import serializers
 
@@ -8,19 +10,40 @@ from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
                             RecipeTag, ShoppingCart, Tag)
 from users.models import Follow, User
 
-from .utils import get_boolean
+from .images import check_image_header, decode_base64_image, get_image_variants
+from .signals import recipe_ingredients_changed
+from .utils import get_boolean, get_recipes_by_author
+
+
+def get_recipes_limit(request):
+    if request is None:
+        return None
+    recipes_limit = request.query_params.get('recipes_limit', '')
+    if not recipes_limit.isdigit():
+        return None
+    return int(recipes_limit)
 
 
 class Base64ToImageField(serializers.ImageField):
     def to_internal_value(self, data):
-        if not (isinstance(data, str) and data.startswith('data:image')):
+        if isinstance(data, UploadedFile):
+            if data.size > settings.IMAGE_UPLOAD_MAX_SIZE:
+                raise serializers.ValidationError(
+                    'Слишком большой размер изображения'
+                )
+            try:
+                check_image_header(data)
+            except ValueError as error:
+                raise serializers.ValidationError(str(error))
+            return super().to_internal_value(data)
+        if not isinstance(data, str):
             raise serializers.ValidationError(
                 'Неверный формат изображения'
             )
-        format, imgstr = data.split(';base64,')
-        ext = format.split('/')[-1]
-        data = ContentFile(base64.b64decode(imgstr), name='image.' + ext)
-        return data
+        try:
+            return decode_base64_image(data)
+        except ValueError as error:
+            raise serializers.ValidationError(str(error))
 
 
 class UserCreateCustomSerializer(UserCreateSerializer):
@@ -39,7 +62,7 @@ class UserCustomSerializer(UserSerializer):
                   'is_subscribed')
 
     def get_is_subscribed(self, obj):
-        return get_boolean(self, Follow, obj)
+        return get_boolean(self, Follow, obj, 'is_subscribed')
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -77,118 +100,246 @@ class RecipeSerializer(serializers.ModelSerializer):
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
     image = Base64ToImageField()
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
         fields = ('id', 'tags', 'author', 'ingredients', 'is_favorited',
-                  'is_in_shopping_cart', 'name', 'image', 'text',
-                  'cooking_time')
+                  'is_in_shopping_cart', 'name', 'image', 'image_variants',
+                  'text', 'cooking_time')
 
     def get_ingredients(self, obj):
-        return RecipeIngredientSerializer(
-            RecipeIngredient.objects.filter(recipe=obj).all(), many=True
-        ).data
+        recipe_ingredients = obj.recipeingredient_set.all()
+        if 'recipeingredient_set' not in getattr(
+            obj, '_prefetched_objects_cache', {}
+        ):
+            recipe_ingredients = recipe_ingredients.select_related(
+                'ingredient'
+            )
+        return RecipeIngredientSerializer(recipe_ingredients, many=True).data
+
+    def get_image_variants(self, obj):
+        return get_image_variants(obj, self.context.get('request'))
 
     def get_is_favorited(self, obj):
-        return get_boolean(self, Favorite, obj)
+        return get_boolean(self, Favorite, obj, 'is_favorited')
 
     def get_is_in_shopping_cart(self, obj):
-        return get_boolean(self, ShoppingCart, obj)
+        return get_boolean(
+            self, ShoppingCart, obj, 'is_in_shopping_cart'
+        )
+
+    def get_initial_list(self, name):
+        if not hasattr(self.initial_data, 'getlist'):
+            return self.initial_data.get(name)
+        values = []
+        for value in self.initial_data.getlist(name):
+            if isinstance(value, str):
+                value = json.loads(value)
+            if isinstance(value, list):
+                values.extend(value)
+            else:
+                values.append(value)
+        return values
 
     def validate(self, data):
         if 'tags' not in self.initial_data:
             raise serializers.ValidationError('Tags field is required')
         if 'ingredients' not in self.initial_data:
             raise serializers.ValidationError('Ingredients field is required')
-        ingredients = self.initial_data.get('ingredients')
+        try:
+            tags = {int(tag) for tag in self.get_initial_list('tags')}
+            ingredients = [
+                (int(ingredient['id']), int(ingredient['amount']))
+                for ingredient in self.get_initial_list('ingredients')
+            ]
+        except (KeyError, TypeError, ValueError):
+            raise serializers.ValidationError(
+                'Неверный формат тегов или ингредиентов'
+            )
         ingredients_dict = {}
-        for ingredient in ingredients:
-            if int(ingredient['amount']) <= 0:
+        for ingredient_id, amount in ingredients:
+            if amount <= 0:
                 raise serializers.ValidationError(
                     'Количество ингредиента должно быть больше нуля'
                 )
-            if ingredient['id'] not in ingredients_dict:
-                instance = ingredient['id']
-                ingredients_dict[instance] = True
-            else:
+            if ingredient_id in ingredients_dict:
                 raise serializers.ValidationError(
                     'Ингридиенты не должны повторяться'
                 )
-        if int(data['cooking_time']) <= 0:
+            ingredients_dict[ingredient_id] = amount
+        cooking_time = data.get('cooking_time')
+        if cooking_time is not None and int(cooking_time) <= 0:
             raise serializers.ValidationError(
                 'Время готовки должно быть больше нуля'
             )
+        if Tag.objects.filter(pk__in=tags).count() != len(tags):
+            raise serializers.ValidationError('Указан несуществующий тег')
+        if (Ingredient.objects.filter(pk__in=ingredients_dict).count()
+                != len(ingredients_dict)):
+            raise serializers.ValidationError(
+                'Указан несуществующий ингредиент'
+            )
+        data['tags'] = tags
+        data['ingredients'] = ingredients_dict
         return data
 
+    def set_tags(self, recipe, tags, created):
+        existing = set()
+        if not created:
+            existing = set(RecipeTag.objects.filter(
+                recipe=recipe
+            ).values_list('tag_id', flat=True))
+            RecipeTag.objects.filter(
+                recipe=recipe, tag_id__in=existing - tags
+            ).delete()
+        RecipeTag.objects.bulk_create(
+            RecipeTag(recipe=recipe, tag_id=tag_id)
+            for tag_id in tags - existing
+        )
+
+    def set_ingredients(self, recipe, ingredients, created):
+        existing = {}
+        if not created:
+            existing = {
+                recipe_ingredient.ingredient_id: recipe_ingredient
+                for recipe_ingredient in RecipeIngredient.objects.filter(
+                    recipe=recipe
+                )
+            }
+            RecipeIngredient.objects.filter(
+                recipe=recipe,
+                ingredient_id__in=existing.keys() - ingredients.keys()
+            ).delete()
+        changed = []
+        for ingredient_id, amount in ingredients.items():
+            recipe_ingredient = existing.get(ingredient_id)
+            if recipe_ingredient and recipe_ingredient.amount != amount:
+                recipe_ingredient.amount = amount
+                changed.append(recipe_ingredient)
+        RecipeIngredient.objects.bulk_update(changed, ['amount'])
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe, ingredient_id=ingredient_id, amount=amount
+            )
+            for ingredient_id, amount in ingredients.items()
+            if ingredient_id not in existing
+        )
+        recipe_ingredients_changed.send(sender=Recipe, recipe=recipe)
+
+    @transaction.atomic
     def create(self, validated_data):
-        tags = self.initial_data.pop('tags')
-        ingredients = self.initial_data.pop('ingredients')
+        tags = validated_data.pop('tags')
+        ingredients = validated_data.pop('ingredients')
         recipe = Recipe.objects.create(**validated_data)
-        for tag in tags:
-            current_tag = Tag.objects.get(pk=tag)
-            RecipeTag.objects.create(recipe=recipe, tag=current_tag)
-        for ingredient in ingredients:
-            current_ingredient = Ingredient.objects.get(pk=ingredient['id'])
-            amount = ingredient['amount']
-            RecipeIngredient.objects.create(
-                recipe=recipe, ingredient=current_ingredient, amount=amount
-            )
+        self.set_tags(recipe, tags, created=True)
+        self.set_ingredients(recipe, ingredients, created=True)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        tags = self.initial_data.pop('tags')
-        ingredients = self.initial_data.pop('ingredients')
-
-        instance.name = validated_data.get('name', instance.name)
-        instance.cooking_time = validated_data.get(
-            'cooking_time',
-            instance.cooking_time
-        )
-        instance.text = validated_data.get('text', instance.text)
-        instance.image = validated_data.get('image', instance.image)
-        instance.save()
-
-        RecipeTag.objects.filter(recipe=instance).delete()
-        RecipeIngredient.objects.filter(recipe=instance).delete()
-        for tag in tags:
-            current_tag = Tag.objects.get(pk=tag)
-            RecipeTag.objects.create(recipe=instance, tag=current_tag)
-        for ingredient in ingredients:
-            current_ingredient = Ingredient.objects.get(pk=ingredient['id'])
-            amount = ingredient['amount']
-            RecipeIngredient.objects.create(
-                recipe=instance, ingredient=current_ingredient, amount=amount
-            )
+        tags = validated_data.pop('tags')
+        ingredients = validated_data.pop('ingredients')
+
+        fields = [
+            field for field in ('name', 'cooking_time', 'text', 'image')
+            if field in validated_data
+        ]
+        for field in fields:
+            setattr(instance, field, validated_data[field])
+        instance.save(update_fields=fields)
+
+        self.set_tags(instance, tags, created=False)
+        self.set_ingredients(instance, ingredients, created=False)
         return instance
 
 
 class RecipeLightSerializer(serializers.ModelSerializer):
     image = Base64ToImageField()
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_variants', 'cooking_time')
+
+    def get_image_variants(self, obj):
+        return get_image_variants(obj, self.context.get('request'))
+
+
+class ShoppingCartBatchSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=100
+    )
+
+    def validate_recipes(self, value):
+        recipes = set(value)
+        if Recipe.objects.filter(pk__in=recipes).count() != len(recipes):
+            raise serializers.ValidationError('Указан несуществующий рецепт')
+        return recipes
+
+
+class IngredientMatchSerializer(serializers.Serializer):
+    ingredients = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=100
+    )
+    coverage = serializers.IntegerField(
+        min_value=1, max_value=100, default=75
+    )
+
+
+class RecipeMatchSerializer(RecipeSerializer):
+    coverage = serializers.SerializerMethodField()
+    missing_ingredients = serializers.SerializerMethodField()
+
+    class Meta(RecipeSerializer.Meta):
+        fields = RecipeSerializer.Meta.fields + (
+            'coverage', 'missing_ingredients'
+        )
+
+    def get_coverage(self, obj):
+        return round(obj.matched * 100 / obj.total, 1)
+
+    def get_missing_ingredients(self, obj):
+        available = self.context['ingredients']
+        return [
+            recipe_ingredient.ingredient_id
+            for recipe_ingredient in obj.recipeingredient_set.all()
+            if recipe_ingredient.ingredient_id not in available
+        ]
+
+
+class FollowListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        users = list(data)
+        self.context['recipes'] = get_recipes_by_author(
+            [user.id for user in users],
+            get_recipes_limit(self.context.get('request'))
+        )
+        return super().to_representation(users)
 
 
 class FollowSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
 
     class Meta:
         model = User
         fields = ('email', 'id', 'username', 'first_name', 'last_name',
                   'is_subscribed', 'recipes', 'recipes_count')
+        list_serializer_class = FollowListSerializer
 
     def get_recipes(self, obj):
-        request = self.context.get('request')
-        recipes_limit = int(request.query_params.get('recipes_limit'))
-        return RecipeLightSerializer(
-            obj.authors.all()[:recipes_limit], many=True
-        ).data
+        recipes = self.context.get('recipes')
+        if recipes is None:
+            recipes = get_recipes_by_author(
+                [obj.id],
+                get_recipes_limit(self.context.get('request'))
+            )
+        return RecipeLightSerializer(recipes[obj.id], many=True).data
 
     def get_is_subscribed(self, obj):
-        return get_boolean(self, Follow, obj)
-
-    def get_recipes_count(self, obj):
-        return Recipe.objects.filter(author=obj).count()
+        return get_boolean(self, Follow, obj, 'is_subscribed')
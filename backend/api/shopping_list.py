@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Sum
+from django.http import (HttpResponse, HttpResponseNotModified,
+                         StreamingHttpResponse)
+
+from recipes.models import RecipeIngredient, ShoppingCart
+
+from .cache import (OnCommitBatch, bump_versions, cache_stream, etag_matches,
+                    get_version, make_etag)
+
+
+def get_shopping_list(user):
+    return RecipeIngredient.objects.filter(
+        recipe__in_shopping_cart__user=user
+    ).values(
+        name=F('ingredient__name'),
+        measurement_unit=F('ingredient__measurement_unit')
+    ).annotate(
+        amount=Sum('amount')
+    ).order_by('name', 'measurement_unit')
+
+
+def format_shopping_list(rows):
+    for row in rows:
+        yield (f"- {row['name']} ({row['measurement_unit']}) - "
+               f"{row['amount']}")
+
+
+def get_version_key(user_id):
+    return f'shopping_list:version:{user_id}'
+
+
+def get_shopping_list_version(user):
+    return get_version(get_version_key(user.id))
+
+
+def get_cache_key(user, version, part):
+    return f'shopping_list:{user.id}:{version}:{part}'
+
+
+def get_cached_shopping_list(user, version):
+    key = get_cache_key(user, version, 'rows')
+    rows = cache.get(key)
+    if rows is None:
+        rows = list(get_shopping_list(user))
+        cache.set(key, rows, settings.SHOPPING_LIST_CACHE_TIMEOUT)
+    return rows
+
+
+def get_shopping_list_response(request, exporter):
+    version = get_shopping_list_version(request.user)
+    etag = make_etag(request.user.id, version, exporter.format)
+    if etag_matches(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        key = get_cache_key(request.user, version, exporter.format)
+        content = cache.get(key)
+        chunks = None
+        if content is None:
+            chunks = cache_stream(
+                key,
+                exporter.stream(
+                    get_cached_shopping_list(request.user, version)
+                ),
+                settings.SHOPPING_LIST_CACHE_TIMEOUT,
+                settings.SHOPPING_LIST_CACHE_MAX_SIZE
+            )
+        if chunks is not None:
+            response = StreamingHttpResponse(
+                chunks,
+                content_type=exporter.get_content_type()
+            )
+        else:
+            response = HttpResponse(
+                content,
+                content_type=exporter.get_content_type()
+            )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{exporter.get_filename()}"'
+        )
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def invalidate_users(user_ids):
+    bump_versions(get_version_key(user_id) for user_id in user_ids)
+
+
+def invalidate_recipes(recipe_ids):
+    invalidate_users(set(ShoppingCart.objects.filter(
+        recipe_id__in=recipe_ids
+    ).values_list('user_id', flat=True)))
+
+
+def invalidate_ingredients(ingredient_ids):
+    invalidate_users(set(ShoppingCart.objects.filter(
+        recipe__recipeingredient__ingredient_id__in=ingredient_ids
+    ).values_list('user_id', flat=True)))
+
+
+changed_users = OnCommitBatch(invalidate_users)
+changed_recipes = OnCommitBatch(invalidate_recipes)
+changed_ingredients = OnCommitBatch(invalidate_ingredients)
@@ -0,0 +1,128 @@
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_out
+from django.core.signals import request_started
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from rest_framework.authtoken.models import Token
+
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart, Tag)
+from recipes.signals import bulk_loaded
+from users.models import User
+
+from .authentication import token_cache
+from .cache import changed_references
+from .counters import connect_counters
+from .images import needs_processing, schedule_image_processing
+from .ingredient_search import ingredient_index
+from .ranking import changed_scores
+from .recipe_matcher import changed_matcher_recipes
+from .recipe_search import changed_search_ingredients, changed_search_recipes
+from .shopping_list import changed_ingredients, changed_recipes, changed_users
+
+recipe_ingredients_changed = Signal()
+
+connect_counters()
+
+
+@receiver(bulk_loaded, sender=Ingredient)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_ingredient_index(sender, **kwargs):
+    transaction.on_commit(ingredient_index.invalidate)
+    changed_references.add('ingredients')
+
+
+@receiver(bulk_loaded, sender=Tag)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tags(sender, **kwargs):
+    changed_references.add('tags')
+
+
+@receiver(post_save, sender=Ingredient)
+def invalidate_ingredient_shopping_lists(sender, instance, created,
+                                         **kwargs):
+    if not created:
+        changed_ingredients.add(instance.id)
+
+
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_delete, sender=ShoppingCart)
+def invalidate_user_shopping_list(sender, instance, **kwargs):
+    changed_users.add(instance.user_id)
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingCart)
+def mark_recipe_score_dirty(sender, instance, **kwargs):
+    changed_scores.add(instance.recipe_id)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def invalidate_recipe_shopping_lists(sender, instance, **kwargs):
+    changed_recipes.add(instance.recipe_id)
+
+
+@receiver(recipe_ingredients_changed)
+def invalidate_bulk_recipe_shopping_lists(sender, recipe, **kwargs):
+    changed_recipes.add(recipe.id)
+
+
+@receiver(post_save, sender=Ingredient)
+def update_ingredient_search_index(sender, instance, created, **kwargs):
+    if not created:
+        changed_search_ingredients.add(instance.id)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def update_recipe_search_index(sender, instance, **kwargs):
+    changed_search_recipes.add(instance.id)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def update_recipe_ingredients_search_index(sender, instance, **kwargs):
+    changed_search_recipes.add(instance.recipe_id)
+    changed_matcher_recipes.add(instance.recipe_id)
+
+
+@receiver(recipe_ingredients_changed)
+def update_bulk_recipe_search_index(sender, recipe, **kwargs):
+    changed_search_recipes.add(recipe.id)
+    changed_matcher_recipes.add(recipe.id)
+
+
+@receiver(post_save, sender=Recipe)
+def process_recipe_image(sender, instance, **kwargs):
+    if needs_processing(instance):
+        schedule_image_processing(instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_user_tokens(sender, instance, **kwargs):
+    token_cache.evict_user(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    token_cache.evict_user(instance.user_id)
+
+
+@receiver(user_logged_out)
+def evict_logged_out_user(sender, user, **kwargs):
+    if user is not None:
+        token_cache.evict_user(user.pk)
+
+
+@receiver(request_started)
+def schedule_database_health_checks(sender, **kwargs):
+    if not settings.DB_HEALTH_CHECKS:
+        return
+    for connection in connections.all():
+        if connection.connection is not None:
+            connection.health_check_pending = True
@@ -0,0 +1,107 @@
+import base64
+import io
+
+from django.db.models import F
+from PIL import Image
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from users.models import User
+
+RECIPE_IMAGE = 'recipes/images/image.jpeg'
+
+
+def make_users(count, prefix='user'):
+    users = [
+        User(
+            username=f'{prefix}{number}',
+            email=f'{prefix}{number}@example.com',
+            first_name=prefix,
+            last_name=str(number)
+        )
+        for number in range(count)
+    ]
+    User.objects.bulk_create(users)
+    return list(User.objects.filter(username__startswith=prefix))
+
+
+def make_ingredients(count):
+    Ingredient.objects.bulk_create(
+        Ingredient(name=f'ингредиент {number}', measurement_unit='г')
+        for number in range(count)
+    )
+    return list(Ingredient.objects.order_by('id'))
+
+
+def make_tags(count):
+    Tag.objects.bulk_create(
+        Tag(name=f'тег {number}', color=f'#{number:06x}', slug=f'tag{number}')
+        for number in range(count)
+    )
+    return list(Tag.objects.order_by('id'))
+
+
+def make_client(user=None):
+    client = APIClient()
+    if user is not None:
+        client.force_authenticate(user)
+    return client
+
+
+def make_recipes(author, count, ingredients, ingredients_per_recipe):
+    Recipe.objects.bulk_create(
+        Recipe(
+            author=author,
+            name=f'рецепт {number}',
+            image=RECIPE_IMAGE,
+            image_variants={'source': RECIPE_IMAGE},
+            text='текст',
+            cooking_time=10
+        )
+        for number in range(count)
+    )
+    User.objects.filter(pk=author.pk).update(
+        recipes_count=F('recipes_count') + count
+    )
+    recipes = list(
+        Recipe.objects.filter(author=author).order_by('-id')[:count]
+    )
+    RecipeIngredient.objects.bulk_create(
+        RecipeIngredient(
+            recipe=recipe,
+            ingredient=ingredients[
+                (recipe.id + offset) % len(ingredients)
+            ],
+            amount=offset + 1
+        )
+        for recipe in recipes
+        for offset in range(ingredients_per_recipe)
+    )
+    return recipes
+
+
+def make_recipe(author, name, ingredients, text='текст'):
+    recipe = Recipe.objects.create(
+        author=author,
+        name=name,
+        image=RECIPE_IMAGE,
+        image_variants={'source': RECIPE_IMAGE},
+        text=text,
+        cooking_time=10
+    )
+    for amount, ingredient in enumerate(ingredients, start=1):
+        RecipeIngredient.objects.create(
+            recipe=recipe, ingredient=ingredient, amount=amount
+        )
+    return recipe
+
+
+def make_image_content(size=(1, 1), format='PNG'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size).save(buffer, format=format)
+    return buffer.getvalue()
+
+
+def make_image(size=(1, 1), format='PNG'):
+    encoded = base64.b64encode(make_image_content(size, format)).decode()
+    return f'data:image/{format.lower()};base64,{encoded}'
@@ -0,0 +1,42 @@
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from ..authentication import token_cache
+from .factories import make_users
+
+
+class TokenCacheTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user, = make_users(1, prefix='token')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def get_me(self):
+        return self.client.get('/api/users/me/')
+
+    def test_cached_lookup_skips_token_query(self):
+        self.assertEqual(self.get_me().status_code, 200)
+        with self.assertNumQueries(1):
+            response = self.get_me()
+        self.assertEqual(response.json()['id'], self.user.id)
+
+    def test_cached_user_has_no_password(self):
+        self.get_me()
+        user = token_cache.get(self.token.key)
+        self.assertIn('password', user.get_deferred_fields())
+
+    def test_logout_evicts_token(self):
+        self.assertEqual(self.get_me().status_code, 200)
+        response = self.client.post('/api/auth/token/logout/')
+        self.assertEqual(response.status_code, 204)
+        self.assertIsNone(token_cache.get(self.token.key))
+        self.assertEqual(self.get_me().status_code, 401)
+
+    def test_deactivated_user_is_evicted(self):
+        self.get_me()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get_me().status_code, 401)
@@ -0,0 +1,122 @@
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+
+from recipes.models import Ingredient, RecipeIngredient, ShoppingCart, Tag
+
+from .factories import make_client, make_ingredients, make_recipes, make_users
+
+SHOPPING_LIST_URL = '/api/recipes/download_shopping_cart/?format=txt'
+
+
+def read(response):
+    if response.streaming:
+        return b''.join(response.streaming_content).decode()
+    return response.content.decode()
+
+
+class ReferenceCacheTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = make_client()
+        Tag.objects.create(name='завтрак', color='#ffffff', slug='breakfast')
+
+    def assert_refreshed(self, url, change, expected):
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn(expected, response.content.decode())
+
+    def test_tag_change_refreshes_tag_list(self):
+        self.assert_refreshed(
+            '/api/tags/',
+            lambda: Tag.objects.create(
+                name='обед', color='#000000', slug='lunch'
+            ),
+            'lunch'
+        )
+
+    def test_ingredient_change_refreshes_search(self):
+        Ingredient.objects.create(name='соль', measurement_unit='г')
+        self.assert_refreshed(
+            '/api/ingredients/?name=%D1%81',
+            lambda: Ingredient.objects.create(
+                name='сахар', measurement_unit='г'
+            ),
+            'сахар'
+        )
+
+    def test_cached_list_has_cache_headers(self):
+        response = self.client.get('/api/tags/')
+        self.assertIn('max-age=', response['Cache-Control'])
+        self.assertEqual(
+            self.client.get('/api/tags/').content, response.content
+        )
+
+
+@override_settings(IMAGE_WORKERS=0)
+class ShoppingListCacheTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user, self.author = make_users(2, prefix='cart')
+        self.recipe, self.other = make_recipes(
+            self.author, 2, make_ingredients(4), 2
+        )
+        ShoppingCart.objects.create(user=self.user, recipe=self.recipe)
+        self.client = make_client(self.user)
+
+    def get_list(self, etag=''):
+        return self.client.get(SHOPPING_LIST_URL, HTTP_IF_NONE_MATCH=etag)
+
+    def assert_invalidated(self, change):
+        etag = self.get_list()['ETag']
+        self.assertEqual(self.get_list(etag).status_code, 304)
+        change()
+        response = self.get_list(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        return read(response)
+
+    def test_repeated_download_is_served_from_cache(self):
+        first = read(self.get_list())
+        with self.assertNumQueries(0):
+            second = self.get_list()
+        self.assertEqual(read(second), first)
+
+    def test_cart_change_invalidates_list(self):
+        content = self.assert_invalidated(
+            lambda: self.client.get(
+                f'/api/recipes/{self.other.id}/shopping_cart/'
+            )
+        )
+        for item in self.other.recipeingredient_set.all():
+            self.assertIn(item.ingredient.name, content)
+
+    def test_recipe_ingredient_change_invalidates_list(self):
+        item = RecipeIngredient.objects.filter(recipe=self.recipe).first()
+
+        def change_amount():
+            item.amount = 99
+            item.save()
+
+        self.assertIn('99', self.assert_invalidated(change_amount))
+
+    def test_ingredient_rename_invalidates_list(self):
+        ingredient = self.recipe.recipeingredient_set.first().ingredient
+
+        def rename():
+            ingredient.name = 'переименован'
+            ingredient.save()
+
+        self.assertIn('переименован', self.assert_invalidated(rename))
+
+    def test_other_users_list_is_not_shared(self):
+        other = make_client(self.author)
+        self.assertEqual(read(other.get(SHOPPING_LIST_URL)), '')
+        self.assertNotEqual(read(self.get_list()), '')
@@ -0,0 +1,75 @@
+from django.test import TestCase
+
+from recipes.models import Favorite, Recipe
+from users.models import Follow, User
+
+from ..counters import COUNTERS
+from .factories import make_client, make_ingredients, make_recipes, make_users
+
+
+class CounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.author = make_users(2, prefix='counter')
+        cls.recipe, = make_recipes(cls.author, 1, make_ingredients(2), 2)
+
+    def setUp(self):
+        self.client = make_client(self.user)
+
+    def assert_count(self, instance, field, expected):
+        instance.refresh_from_db(fields=[field])
+        self.assertEqual(getattr(instance, field), expected)
+
+    def test_favorites_count(self):
+        url = f'/api/recipes/{self.recipe.id}/favorite/'
+        self.client.get(url)
+        self.assert_count(self.recipe, 'favorites_count', 1)
+        self.client.delete(url)
+        self.assert_count(self.recipe, 'favorites_count', 0)
+
+    def test_followers_count(self):
+        url = f'/api/users/{self.author.id}/subscribe/'
+        self.client.get(url)
+        self.assert_count(self.author, 'followers_count', 1)
+        self.client.delete(url)
+        self.assert_count(self.author, 'followers_count', 0)
+
+    def test_recipes_count(self):
+        recipe = Recipe.objects.create(
+            author=self.author,
+            name='суп',
+            image=self.recipe.image.name,
+            image_variants=self.recipe.image_variants,
+            text='текст',
+            cooking_time=5
+        )
+        self.assert_count(self.author, 'recipes_count', 2)
+        recipe.delete()
+        self.assert_count(self.author, 'recipes_count', 1)
+
+    def test_full_save_keeps_counter(self):
+        Favorite.objects.create(user=self.user, recipe=self.recipe)
+        stale = Recipe.objects.get(pk=self.recipe.pk)
+        Favorite.objects.create(user=self.author, recipe=self.recipe)
+        stale.name = 'новое название'
+        stale.save()
+        self.assert_count(self.recipe, 'favorites_count', 2)
+
+    def test_counters_are_never_negative(self):
+        Favorite.objects.create(user=self.user, recipe=self.recipe)
+        Recipe.objects.filter(pk=self.recipe.pk).update(favorites_count=0)
+        Favorite.objects.all().delete()
+        self.assert_count(self.recipe, 'favorites_count', 0)
+
+    def test_repair_fixes_drift(self):
+        Follow.objects.create(user=self.user, author=self.author)
+        User.objects.filter(pk=self.author.pk).update(
+            followers_count=5, recipes_count=0
+        )
+        repaired = sum(counter.repair() for counter in COUNTERS)
+        self.assertEqual(repaired, 2)
+        self.assert_count(self.author, 'followers_count', 1)
+        self.assert_count(self.author, 'recipes_count', 1)
+        self.assertFalse(any(
+            counter.drifted().exists() for counter in COUNTERS
+        ))
@@ -0,0 +1,78 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from recipes.models import Favorite, RecipeTag, ShoppingCart
+
+from .factories import (make_client, make_ingredients, make_recipes, make_tags,
+                        make_users)
+
+
+class RecipeFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.author, cls.other = make_users(3, prefix='filter')
+        ingredients = make_ingredients(5)
+        cls.breakfast, cls.lunch, cls.dinner = make_tags(3)
+        cls.first, cls.second = make_recipes(cls.author, 2, ingredients, 2)
+        cls.third, = make_recipes(cls.other, 1, ingredients, 2)
+        RecipeTag.objects.bulk_create([
+            RecipeTag(recipe=cls.first, tag=cls.breakfast),
+            RecipeTag(recipe=cls.second, tag=cls.lunch),
+            RecipeTag(recipe=cls.third, tag=cls.breakfast),
+            RecipeTag(recipe=cls.third, tag=cls.lunch),
+        ])
+        Favorite.objects.create(user=cls.user, recipe=cls.first)
+        ShoppingCart.objects.create(user=cls.user, recipe=cls.second)
+
+    def setUp(self):
+        cache.clear()
+        self.client = make_client(self.user)
+
+    def get_ids(self, params, client=None):
+        response = (client or self.client).get('/api/recipes/', params)
+        self.assertEqual(response.status_code, 200)
+        return {recipe['id'] for recipe in response.json()['results']}
+
+    def test_tags_match_any_slug_without_duplicates(self):
+        response = self.client.get('/api/recipes/', {
+            'tags': [self.breakfast.slug, self.lunch.slug]
+        })
+        ids = [recipe['id'] for recipe in response.json()['results']]
+        self.assertCountEqual(
+            ids, [self.first.id, self.second.id, self.third.id]
+        )
+        self.assertEqual(
+            self.get_ids({'tags': self.breakfast.slug}),
+            {self.first.id, self.third.id}
+        )
+        self.assertEqual(self.get_ids({'tags': self.dinner.slug}), set())
+
+    def test_is_favorited(self):
+        self.assertEqual(self.get_ids({'is_favorited': 1}), {self.first.id})
+        self.assertEqual(
+            self.get_ids({'is_favorited': 0}),
+            {self.second.id, self.third.id}
+        )
+
+    def test_is_in_shopping_cart(self):
+        self.assertEqual(
+            self.get_ids({'is_in_shopping_cart': 1}), {self.second.id}
+        )
+
+    def test_relation_filters_for_anonymous_user(self):
+        anonymous = make_client()
+        self.assertEqual(self.get_ids({'is_favorited': 1}, anonymous), set())
+        self.assertEqual(
+            self.get_ids({'is_in_shopping_cart': 0}, anonymous),
+            {self.first.id, self.second.id, self.third.id}
+        )
+
+    def test_author_combined_with_tags(self):
+        self.assertEqual(
+            self.get_ids({'author': self.author.id}),
+            {self.first.id, self.second.id}
+        )
+        self.assertEqual(
+            self.get_ids({'author': self.author.id, 'tags': self.lunch.slug}),
+            {self.second.id}
+        )
@@ -0,0 +1,76 @@
+import base64
+import io
+import os
+
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from ..images import BASE64_CHUNK_SIZE, decode_base64_image
+from .factories import make_image, make_image_content
+
+
+class DecodeBase64ImageTests(SimpleTestCase):
+    def assert_rejected(self, data, message):
+        with self.assertRaisesMessage(ValueError, message):
+            decode_base64_image(data)
+
+    def test_valid_image(self):
+        image = decode_base64_image(make_image((20, 10)))
+        self.assertEqual(image.name, 'image.png')
+        self.assertEqual(image.read(), make_image_content((20, 10)))
+        image.close()
+
+    def test_image_larger_than_chunk(self):
+        buffer = io.BytesIO()
+        Image.frombytes('RGB', (400, 400), os.urandom(400 * 400 * 3)).save(
+            buffer, format='PNG'
+        )
+        content = buffer.getvalue()
+        self.assertGreater(len(content), BASE64_CHUNK_SIZE)
+        encoded = base64.b64encode(content).decode()
+        image = decode_base64_image(f'data:image/png;base64,{encoded}')
+        self.assertEqual(image.read(), content)
+        image.close()
+
+    def test_not_a_data_uri(self):
+        self.assert_rejected('image.png', 'Неверный формат изображения')
+        self.assert_rejected(
+            'data:image/png,' + 'A' * 10, 'Неверный формат изображения'
+        )
+
+    def test_invalid_base64(self):
+        self.assert_rejected(
+            'data:image/png;base64,!!!!', 'Неверный формат изображения'
+        )
+
+    @override_settings(IMAGE_UPLOAD_MAX_SIZE=100)
+    def test_size_limit_checked_before_decoding(self):
+        self.assert_rejected(
+            'data:image/png;base64,' + 'A' * 200,
+            'Слишком большой размер изображения'
+        )
+
+    def test_not_an_image(self):
+        encoded = base64.b64encode(b'not an image').decode()
+        self.assert_rejected(
+            f'data:image/png;base64,{encoded}',
+            'Файл не является изображением'
+        )
+
+    def test_unsupported_format(self):
+        self.assert_rejected(
+            make_image((2, 2), 'BMP'), 'Неподдерживаемый формат изображения'
+        )
+
+    @override_settings(IMAGE_UPLOAD_MAX_PIXELS=100)
+    def test_pixel_limit(self):
+        self.assert_rejected(
+            make_image((20, 20)), 'Слишком большое разрешение изображения'
+        )
+
+    def test_truncated_image(self):
+        content = make_image_content((64, 64))
+        encoded = base64.b64encode(content[:len(content) // 2]).decode()
+        self.assert_rejected(
+            f'data:image/png;base64,{encoded}', 'Файл изображения повреждён'
+        )
@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TransactionTestCase
+
+from recipes.models import Ingredient, Tag
+
+from .factories import make_client
+
+
+class LoaderTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def load(self, command, path, *args):
+        output = StringIO()
+        call_command(command, path, *args, stdout=output)
+        return output.getvalue()
+
+    def test_ingredients_from_csv(self):
+        path = self.write('ingredients.csv', (
+            'name,measurement_unit\n'
+            'соль,г\n'
+            'сахар,г\n'
+            'соль,г\n'
+            ',г\n'
+            'молоко\n'
+        ))
+        output = self.load('load_ingredients', path, '--batch-size', '1')
+        self.assertIn('Обработано строк: 2, пропущено: 3', output)
+        self.assertCountEqual(
+            Ingredient.objects.values_list('name', 'measurement_unit'),
+            [('соль', 'г'), ('сахар', 'г')]
+        )
+        self.load('load_ingredients', path, '--upsert')
+        self.assertEqual(Ingredient.objects.count(), 2)
+
+    def test_ingredients_from_json(self):
+        path = self.write('ingredients.json', json.dumps([
+            {'name': 'мука', 'measurement_unit': 'г'},
+            {'model': 'recipes.ingredient',
+             'fields': {'name': 'яйцо', 'measurement_unit': 'шт.'}},
+        ], ensure_ascii=False))
+        self.load('load_ingredients', path)
+        self.assertCountEqual(
+            Ingredient.objects.values_list('name', flat=True),
+            ['мука', 'яйцо']
+        )
+
+    def test_invalid_files(self):
+        with self.assertRaises(CommandError):
+            self.load('load_ingredients', self.write('data.txt', ''))
+        with self.assertRaises(CommandError):
+            self.load('load_ingredients', self.write('data.json', '{}'))
+
+    def test_tags_upsert(self):
+        path = self.write('tags.csv', 'Завтрак,#ffffff,breakfast\n')
+        self.load('load_tags', path)
+        path = self.write('tags.csv', (
+            'Утро,#eeeeee,breakfast\n'
+            'Обед,#000000,lunch\n'
+        ))
+        self.load('load_tags', path)
+        self.assertEqual(Tag.objects.get(slug='breakfast').name, 'Завтрак')
+        self.load('load_tags', path, '--upsert')
+        self.assertCountEqual(
+            Tag.objects.values_list('slug', 'name', 'color'),
+            [('breakfast', 'Утро', '#eeeeee'), ('lunch', 'Обед', '#000000')]
+        )
+
+    def test_load_refreshes_cached_lists(self):
+        client = make_client()
+        etags = {
+            url: client.get(url)['ETag']
+            for url in ('/api/tags/', '/api/ingredients/?name=%D1%81')
+        }
+        self.load('load_tags', self.write('tags.csv', 'Обед,#fff,lunch\n'))
+        self.load('load_ingredients', self.write('items.csv', 'соль,г\n'))
+        for url, etag in etags.items():
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()), 1)
@@ -0,0 +1,73 @@
+from django.test import TransactionTestCase, override_settings
+
+from recipes.models import Ingredient, RecipeIngredient
+
+from ..recipe_matcher import recipe_matcher
+from .factories import make_client, make_recipe, make_users
+
+MATCH_URL = '/api/recipes/match/'
+
+
+class RecipeMatcherTests(TransactionTestCase):
+    def setUp(self):
+        recipe_matcher.invalidate()
+        author, = make_users(1, prefix='matcher')
+        self.ingredients = [
+            Ingredient.objects.create(
+                name=f'ингредиент {number}', measurement_unit='г'
+            )
+            for number in range(4)
+        ]
+        first, second, third, fourth = self.ingredients
+        self.small = make_recipe(author, 'малый', [first, second])
+        self.large = make_recipe(author, 'большой', self.ingredients)
+        self.other = make_recipe(author, 'другой', [third])
+        self.client = make_client()
+
+    def match(self, ingredients, **params):
+        response = self.client.get(MATCH_URL, {
+            'ingredients': [ingredient.id for ingredient in ingredients],
+            **params
+        })
+        self.assertEqual(response.status_code, 200)
+        return [
+            (recipe['id'], recipe['coverage'], recipe['missing_ingredients'])
+            for recipe in response.json()['results']
+        ]
+
+    def assert_matches(self):
+        first, second, third, fourth = self.ingredients
+        self.assertEqual(
+            self.match([first, second]), [(self.small.id, 100.0, [])]
+        )
+        self.assertEqual(self.match([first, second], coverage=50), [
+            (self.small.id, 100.0, []),
+            (self.large.id, 50.0, [third.id, fourth.id]),
+        ])
+        self.assertEqual(self.match([fourth], coverage=100), [])
+
+    def test_index(self):
+        self.assert_matches()
+
+    @override_settings(RECIPE_MATCHER_INDEX=False)
+    def test_database(self):
+        self.assert_matches()
+
+    def test_index_follows_recipe_changes(self):
+        first, second, third, fourth = self.ingredients
+        self.assertEqual(self.match([fourth], coverage=100), [])
+        RecipeIngredient.objects.create(
+            recipe=self.other, ingredient=fourth, amount=1
+        )
+        RecipeIngredient.objects.filter(
+            recipe=self.other, ingredient=third
+        ).delete()
+        self.assertEqual(
+            self.match([fourth], coverage=100), [(self.other.id, 100.0, [])]
+        )
+
+    def test_invalid_parameters(self):
+        for params in ({}, {'ingredients': 'x'},
+                       {'ingredients': 1, 'coverage': 0}):
+            response = self.client.get(MATCH_URL, params)
+            self.assertEqual(response.status_code, 400)
@@ -0,0 +1,76 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from recipes.models import Favorite, RecipeTag, ShoppingCart, Tag
+from users.models import Follow
+
+from .factories import make_ingredients, make_recipes, make_users
+
+RECIPE_LIST_QUERIES = 5
+SUBSCRIPTIONS_QUERIES = 3
+
+
+@override_settings(IMAGE_WORKERS=0)
+class QueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.author, cls.other = make_users(3, prefix='query')
+        cls.ingredients = make_ingredients(10)
+        cls.tag = Tag.objects.create(
+            name='завтрак', color='#ffffff', slug='breakfast'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_recipes(self, author, count):
+        recipes = make_recipes(author, count, self.ingredients, 3)
+        RecipeTag.objects.bulk_create(
+            RecipeTag(recipe=recipe, tag=self.tag) for recipe in recipes
+        )
+        Favorite.objects.create(user=self.user, recipe=recipes[0])
+        ShoppingCart.objects.create(user=self.user, recipe=recipes[0])
+        return recipes
+
+    def assert_constant_queries(self, url, add_data):
+        with self.assertNumQueries(RECIPE_LIST_QUERIES):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        add_data()
+        with self.assertNumQueries(RECIPE_LIST_QUERIES):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_recipe_list_queries_do_not_grow_with_page_size(self):
+        self.add_recipes(self.author, 1)
+        response = self.assert_constant_queries(
+            '/api/recipes/?limit=30',
+            lambda: self.add_recipes(self.other, 20)
+        )
+        self.assertEqual(len(response.json()['results']), 21)
+
+    def test_subscriptions_without_follows(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                '/api/users/subscriptions/?recipes_limit=3'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [])
+
+    def test_subscriptions_queries_do_not_grow_with_authors(self):
+        self.add_recipes(self.author, 5)
+        Follow.objects.create(user=self.user, author=self.author)
+        url = '/api/users/subscriptions/?recipes_limit=3'
+        with self.assertNumQueries(SUBSCRIPTIONS_QUERIES):
+            self.client.get(url)
+        self.add_recipes(self.other, 5)
+        Follow.objects.create(user=self.user, author=self.other)
+        with self.assertNumQueries(SUBSCRIPTIONS_QUERIES):
+            response = self.client.get(url)
+        results = response.json()['results']
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(len(user['recipes']) == 3 for user in results))
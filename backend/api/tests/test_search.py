@@ -0,0 +1,53 @@
+from django.test import TransactionTestCase
+
+from recipes.models import Ingredient
+
+from .factories import make_client, make_recipe, make_users
+
+
+class RecipeSearchTests(TransactionTestCase):
+    def setUp(self):
+        author, = make_users(1, prefix='search')
+        beet, cabbage, mayonnaise = (
+            Ingredient.objects.create(name=name, measurement_unit='г')
+            for name in ('свекла', 'капуста', 'майонез')
+        )
+        self.borscht = make_recipe(author, 'Борщ', [beet, cabbage])
+        self.salad = make_recipe(
+            author, 'Салат с селёдкой', [beet, mayonnaise]
+        )
+        self.baked = make_recipe(author, 'Свекла запечённая', [beet])
+        self.client = make_client()
+
+    def search(self, query):
+        response = self.client.get('/api/recipes/', {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return [recipe['id'] for recipe in response.json()['results']]
+
+    def test_name_and_ingredients_are_searched(self):
+        self.assertEqual(self.search('борщ'), [self.borscht.id])
+        self.assertEqual(self.search('майонез'), [self.salad.id])
+
+    def test_prefix_and_all_words(self):
+        self.assertEqual(self.search('бор'), [self.borscht.id])
+        self.assertEqual(self.search('свекла майонез'), [self.salad.id])
+
+    def test_name_match_ranks_first(self):
+        ids = self.search('свекла')
+        self.assertEqual(ids[0], self.baked.id)
+        self.assertCountEqual(
+            ids, [self.borscht.id, self.salad.id, self.baked.id]
+        )
+
+    def test_query_without_words_is_ignored(self):
+        self.assertEqual(len(self.search('!!!')), 3)
+
+    def test_index_follows_recipe_changes(self):
+        self.borscht.name = 'Щи'
+        self.borscht.save()
+        self.assertEqual(self.search('щи'), [self.borscht.id])
+        self.assertEqual(self.search('борщ'), [])
+        self.salad.recipeingredient_set.filter(
+            ingredient__name='майонез'
+        ).delete()
+        self.assertEqual(self.search('майонез'), [])
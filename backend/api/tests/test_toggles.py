@@ -0,0 +1,65 @@
+from django.test import TestCase
+
+from recipes.models import Favorite, ShoppingCart
+from users.models import Follow
+
+from .factories import make_client, make_ingredients, make_recipes, make_users
+
+
+class ToggleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.author = make_users(2, prefix='toggle')
+        cls.recipe, = make_recipes(cls.author, 1, make_ingredients(2), 2)
+
+    def setUp(self):
+        self.client = make_client(self.user)
+
+    def assert_toggle(self, url, model, **fields):
+        self.assertEqual(self.client.get(url).status_code, 201)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+        self.assertEqual(model.objects.filter(**fields).count(), 1)
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.delete(url).status_code, 400)
+        self.assertFalse(model.objects.filter(**fields).exists())
+
+    def test_favorite(self):
+        self.assert_toggle(
+            f'/api/recipes/{self.recipe.id}/favorite/',
+            Favorite, user=self.user, recipe=self.recipe
+        )
+
+    def test_shopping_cart(self):
+        self.assert_toggle(
+            f'/api/recipes/{self.recipe.id}/shopping_cart/',
+            ShoppingCart, user=self.user, recipe=self.recipe
+        )
+
+    def test_subscribe(self):
+        self.assert_toggle(
+            f'/api/users/{self.author.id}/subscribe/',
+            Follow, user=self.user, author=self.author
+        )
+
+    def test_subscribe_to_self(self):
+        response = self.client.get(f'/api/users/{self.user.id}/subscribe/')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_missing_object(self):
+        self.assertEqual(
+            self.client.get('/api/recipes/0/favorite/').status_code, 404
+        )
+
+    def test_shopping_cart_batch_is_idempotent(self):
+        url = '/api/recipes/shopping_cart/'
+        data = {'recipes': [self.recipe.id]}
+        for _ in range(2):
+            response = self.client.post(url, data, format='json')
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(ShoppingCart.objects.count(), 1)
+        response = self.client.delete(url, data, format='json')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(ShoppingCart.objects.exists())
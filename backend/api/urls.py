@@ -1,7 +1,7 @@
 from django.urls import include, path
 from rest_framework import routers
 
-from .views import (IngredientViewSet, RecipeViewSet, TagViewSet,
+from .views import (IngredientViewSet, MetricsView, RecipeViewSet, TagViewSet,
                     UserCustomViewSet)
 
 router = routers.DefaultRouter()
@@ -12,5 +12,6 @@ router.register(r'recipes', RecipeViewSet, basename='recipes')
 
 urlpatterns = [
     path('auth/', include('djoser.urls.authtoken')),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
     path('', include(router.urls)),
 ]
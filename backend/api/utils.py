@@ -1,122 +1,142 @@
-from collections import Counter
+from collections import defaultdict
 
-from django.core.exceptions import FieldError
+from django.db import IntegrityError, transaction
+from django.db.models import (BooleanField, Exists, F, OuterRef, Prefetch,
+                              Value, Window)
+from django.db.models.functions import RowNumber
 from rest_framework import status, viewsets
 from rest_framework.response import Response
 
-from recipes.models import Ingredient, RecipeIngredient
-
-
-def queryset_filter(self, model_id_list, model_main, value):
-    instances = model_id_list.objects.filter(
-        user_id=self.request.user.id
-    ).values(value)
-    instance_id_list = []
-    for instance in instances:
-        instance_id_list.append(instance.get(value))
-    return model_main.objects.filter(pk__in=instance_id_list)
-
-
-def get_ingredients_unique_list(self, in_shopping_cart):
-    ingredients_list = []
-    for recipe in in_shopping_cart:
-        recipe_id = recipe.get('recipe_id')
-        ingredients = RecipeIngredient.objects.filter(
-            recipe_id=recipe_id
-        ).values('ingredient_id', 'amount')
-        for ingredient in ingredients:
-            ingredient_id = ingredient.get('ingredient_id')
-            name = Ingredient.objects.get(pk=ingredient_id).name
-            measurement_unit = Ingredient.objects.get(
-                pk=ingredient_id).measurement_unit
-            amount = ingredient.get('amount')
-            ingredient_dict = {
-                'name': f'{name} ({measurement_unit})',
-                'amount': amount,
-            }
-            ingredients_list.append(ingredient_dict)
-
-    counter = Counter()
-    for ingredient in ingredients_list:
-        key, value = ingredient.get('name'), ingredient.get('amount')
-        counter.update({key: value})
-
-    ingredients_unique_list = [
-        {'name': key, 'amount': value} for key, value in counter.items()
-    ]
-    return ingredients_unique_list
-
-
-def get_boolean(self, model, obj):
+from recipes.models import Favorite, Recipe, RecipeIngredient, ShoppingCart
+from users.models import Follow, User
+
+RELATION_FIELDS = {
+    Follow: 'author',
+    Favorite: 'recipe',
+    ShoppingCart: 'recipe',
+}
+RELATION_ERRORS = {
+    Follow: (
+        'Вы уже подписаны на пользователя',
+        'Сначала надо подписаться на пользователя',
+    ),
+    Favorite: (
+        'Рецепт уже добавлен в избранное',
+        'Сначала надо добавить рецепт в избранное',
+    ),
+    ShoppingCart: (
+        'Рецепт уже добавлен в список покупок',
+        'Сначала надо добавить рецепт в список покупок',
+    ),
+}
+
+
+def relation_exists(model, user):
+    if not user.is_authenticated:
+        return Value(False, output_field=BooleanField())
+    return Exists(model.objects.filter(
+        user=user,
+        **{RELATION_FIELDS[model]: OuterRef('pk')}
+    ))
+
+
+def get_users_queryset(user, queryset=None):
+    if queryset is None:
+        queryset = User.objects.all()
+    return queryset.annotate(is_subscribed=relation_exists(Follow, user))
+
+
+def get_recipes_queryset(user):
+    return Recipe.objects.annotate(
+        is_favorited=relation_exists(Favorite, user),
+        is_in_shopping_cart=relation_exists(ShoppingCart, user)
+    ).prefetch_related(
+        'tags',
+        Prefetch('author', queryset=get_users_queryset(user)),
+        Prefetch(
+            'recipeingredient_set',
+            queryset=RecipeIngredient.objects.select_related('ingredient')
+        )
+    )
+
+
+def get_subscriptions_queryset(user):
+    return User.objects.filter(relation_exists(Follow, user)).annotate(
+        is_subscribed=Value(True, output_field=BooleanField())
+    ).order_by('id')
+
+
+def get_recipes_by_author(author_ids, limit=None):
+    recipes_by_author = defaultdict(list)
+    if not author_ids:
+        return recipes_by_author
+    queryset = Recipe.objects.filter(author_id__in=author_ids).only(
+        'id', 'name', 'image', 'image_variants', 'cooking_time', 'author_id'
+    )
+    if limit is None:
+        recipes = queryset.order_by('-publication_date')
+    else:
+        sql, params = queryset.annotate(
+            recipe_rank=Window(
+                expression=RowNumber(),
+                partition_by=F('author_id'),
+                order_by=F('publication_date').desc()
+            )
+        ).order_by().query.sql_with_params()
+        recipes = Recipe.objects.raw(
+            f'SELECT * FROM ({sql}) ranked WHERE ranked.recipe_rank <= %s '
+            f'ORDER BY ranked.recipe_rank',
+            (*params, limit)
+        )
+    for recipe in recipes:
+        recipes_by_author[recipe.author_id].append(recipe)
+    return recipes_by_author
+
+
+def get_boolean(self, model, obj, annotation):
+    if hasattr(obj, annotation):
+        return getattr(obj, annotation)
     request = self.context.get('request', None)
     if not request or not request.user.is_authenticated:
         return False
+    return model.objects.filter(
+        user=request.user,
+        **{RELATION_FIELDS[model]: obj}
+    ).exists()
+
+
+def create_relation(model, **fields):
     try:
-        return model.objects.filter(user=request.user, author=obj).exists()
-    except FieldError:
-        return model.objects.filter(user=request.user, recipe=obj).exists()
+        with transaction.atomic():
+            model.objects.create(**fields)
+    except IntegrityError:
+        return False
+    return True
 
 
 def get_delete(self, request, **kwargs):
     model_1 = kwargs['model_1']
     model_2 = kwargs['model_2']
-    serializer = kwargs['serializer']
-    pk = kwargs['id']
-    message = kwargs['message']
-    instance = viewsets.generics.get_object_or_404(model_1, pk=pk)
-    serializer = serializer(instance)
+    instance = viewsets.generics.get_object_or_404(model_1, pk=kwargs['id'])
+    exists_error, missing_error = RELATION_ERRORS[model_2]
+    if model_2 is Follow and request.user == instance:
+        return Response(
+            {'error': 'Нельзя подписаться на себя'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    fields = {'user': request.user, RELATION_FIELDS[model_2]: instance}
     if request.method == 'GET':
-        try:
-            if model_2.objects.filter(
-                user=request.user,
-                author=instance
-            ).exists():
-                return Response(
-                    {'error': 'Вы уже подписаны на пользователя'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            if request.user == instance:
-                return Response(
-                    {'error': 'Нельзя подписаться на себя'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            model_2.objects.create(user=request.user, author=instance)
-        except FieldError:
-            if model_2.objects.filter(
-                user=request.user,
-                recipe=instance
-            ).exists():
-                return Response(
-                    {'error': f'Рецепт уже добавлен в {message}'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            model_2.objects.create(user=request.user, recipe=instance)
+        if not create_relation(model_2, **fields):
+            return Response(
+                {'error': exists_error},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = kwargs['serializer'](instance)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
-
-    if request.method == 'DELETE':
-        try:
-            if not model_2.objects.filter(
-                user=request.user,
-                author=instance
-            ).exists():
-                return Response(
-                    {'error': 'Сначала надо подписаться на пользователя'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            if request.user == instance:
-                return Response(
-                    {'error': 'Нельзя удалить подпись на себя'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            model_2.objects.filter(user=request.user, author=instance).delete()
-        except FieldError:
-            if not model_2.objects.filter(
-                user=request.user,
-                recipe=instance
-            ).exists():
-                return Response(
-                    {'error': f'Сначала надо добавить рецепт в {message}'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            model_2.objects.filter(user=request.user, recipe=instance).delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+    deleted, _ = model_2.objects.filter(**fields).delete()
+    if not deleted:
+        return Response(
+            {'error': missing_error},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return Response(status=status.HTTP_204_NO_CONTENT)
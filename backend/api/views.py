@@ -1,25 +1,31 @@
-import io
-
-import reportlab
-from django.http import FileResponse
+from django.http import HttpResponse
+from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfgen import canvas
-from rest_framework import permissions, viewsets
+from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from foodgram.settings import BASE_DIR
 from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
 from users.models import Follow, User
 
+from .cache import cache_reference_response
+from .exporters import ShoppingListExporter, get_exporters
+from .filters import RecipeFilter
+from .ingredient_search import get_ingredient_list
+from .metrics import render_metrics
 from .paginations import CustomPaginator
-from .permissions import (IsAdminOrReadOnly, IsAuthorOrAdminOrReadOnly,
-                          IsAuthenticatedReadOnly)
-from .serializers import (FollowSerializer, IngredientSerializer,
-                          RecipeLightSerializer, RecipeSerializer,
-                          TagSerializer)
-from .utils import get_delete, get_ingredients_unique_list, queryset_filter
+from .permissions import (IsAdminOrReadOnly, IsAuthenticatedReadOnly,
+                          IsAuthorOrAdminOrReadOnly)
+from .recipe_matcher import match_recipes
+from .serializers import (FollowSerializer, IngredientMatchSerializer,
+                          IngredientSerializer, RecipeLightSerializer,
+                          RecipeMatchSerializer, RecipeSerializer,
+                          ShoppingCartBatchSerializer, TagSerializer)
+from .shopping_list import changed_users, get_shopping_list_response
+from .utils import (get_delete, get_recipes_queryset,
+                    get_subscriptions_queryset, get_users_queryset)
 
 
 class UserCustomViewSet(UserViewSet):
@@ -36,6 +42,9 @@ class UserCustomViewSet(UserViewSet):
             return (permissions.IsAdminUser(),)
         return super().get_permissions()
 
+    def get_queryset(self):
+        return get_users_queryset(self.request.user, super().get_queryset())
+
     @action(
         detail=False,
         methods=['get', 'delete'],
@@ -49,7 +58,6 @@ class UserCustomViewSet(UserViewSet):
             model_1=User,
             model_2=Follow,
             serializer=FollowSerializer,
-            message='подписка',
             **kwargs
         )
 
@@ -58,12 +66,7 @@ class UserCustomViewSet(UserViewSet):
         permission_classes=(permissions.IsAuthenticated,)
     )
     def subscriptions(self, request):
-        users = queryset_filter(
-            self,
-            model_id_list=Follow,
-            model_main=User,
-            value='author_id'
-        )
+        users = get_subscriptions_queryset(request.user)
         paginator = CustomPaginator()
         response = paginator.generate_response(
             users,
@@ -79,6 +82,10 @@ class TagViewSet(viewsets.ModelViewSet):
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = None
 
+    @cache_reference_response('tags')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
 
 class IngredientViewSet(viewsets.ModelViewSet):
     queryset = Ingredient.objects.all()
@@ -86,42 +93,33 @@ class IngredientViewSet(viewsets.ModelViewSet):
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = None
 
-    def get_queryset(self):
-        queryset = Ingredient.objects.all()
-        name = self.request.query_params.get('name')
-        if name:
-            queryset = queryset.filter(name__startswith=name.lower())
-        return queryset
+    @cache_reference_response('ingredients')
+    def list(self, request, *args, **kwargs):
+        return Response(get_ingredient_list(request.query_params))
 
 
 class RecipeViewSet(viewsets.ModelViewSet):
     serializer_class = RecipeSerializer
     permission_classes = (IsAuthorOrAdminOrReadOnly,)
     pagination_class = CustomPaginator
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = RecipeFilter
 
     def get_queryset(self):
-        queryset = Recipe.objects.all()
-        if self.request.query_params.get('is_favorited'):
-            queryset = queryset_filter(
-                self,
-                model_id_list=Favorite,
-                model_main=Recipe,
-                value='recipe_id'
-            )
-        if self.request.query_params.get('is_in_shopping_cart'):
-            queryset = queryset_filter(
-                self,
-                model_id_list=ShoppingCart,
-                model_main=Recipe,
-                value='recipe_id'
-            )
-        author_id = self.request.query_params.get('author')
-        if author_id:
-            queryset = queryset.filter(author__id=author_id)
-        tags = self.request.query_params.getlist('tags')
-        if tags:
-            queryset = queryset.filter(tags__slug__in=tags).distinct()
-        return queryset
+        return get_recipes_queryset(self.request.user)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if (
+            isinstance(response, Response)
+            and response.status_code >= status.HTTP_400_BAD_REQUEST
+            and isinstance(response.accepted_renderer, ShoppingListExporter)
+        ):
+            response.accepted_renderer = JSONRenderer()
+            response.accepted_media_type = JSONRenderer.media_type
+        return response
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
@@ -139,7 +137,6 @@ class RecipeViewSet(viewsets.ModelViewSet):
             model_1=Recipe,
             model_2=Favorite,
             serializer=RecipeLightSerializer,
-            message='избранное',
             **kwargs
         )
 
@@ -156,40 +153,77 @@ class RecipeViewSet(viewsets.ModelViewSet):
             model_1=Recipe,
             model_2=ShoppingCart,
             serializer=RecipeLightSerializer,
-            message='список покупок',
             **kwargs
         )
 
     @action(
         detail=False,
-        permission_classes=(permissions.IsAuthenticated,)
+        methods=['post', 'delete'],
+        permission_classes=(permissions.IsAuthenticated,),
+        url_path='shopping_cart'
+    )
+    def shopping_cart_batch(self, request):
+        serializer = ShoppingCartBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        recipes = serializer.validated_data['recipes']
+        if request.method == 'DELETE':
+            ShoppingCart.objects.filter(
+                user=request.user, recipe_id__in=recipes
+            ).delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        ShoppingCart.objects.bulk_create(
+            (ShoppingCart(user=request.user, recipe_id=recipe_id)
+             for recipe_id in recipes),
+            ignore_conflicts=True
+        )
+        changed_users.add(request.user.id)
+        serializer = RecipeLightSerializer(
+            Recipe.objects.filter(pk__in=recipes),
+            many=True,
+            context={'request': request}
+        )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False)
+    def match(self, request):
+        serializer = IngredientMatchSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        ingredients = set(serializer.validated_data['ingredients'])
+        page = self.paginate_queryset(match_recipes(
+            ingredients, serializer.validated_data['coverage']
+        ))
+        recipes = get_recipes_queryset(request.user).in_bulk(
+            [recipe_id for recipe_id, _, _ in page]
+        )
+        results = []
+        for recipe_id, matched, total in page:
+            recipe = recipes.get(recipe_id)
+            if recipe is not None:
+                recipe.matched, recipe.total = matched, total
+                results.append(recipe)
+        serializer = RecipeMatchSerializer(
+            results,
+            many=True,
+            context={'request': request, 'ingredients': ingredients}
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        permission_classes=(permissions.IsAuthenticated,),
+        renderer_classes=get_exporters()
     )
     def download_shopping_cart(self, request):
-        in_shopping_cart = ShoppingCart.objects.filter(
-            user_id=request.user.id
-        ).values('recipe_id')
-        ingredients_unique_list = get_ingredients_unique_list(
-            self,
-            in_shopping_cart
+        return get_shopping_list_response(
+            request, request.accepted_renderer
         )
-        buffer = io.BytesIO()
-        p = canvas.Canvas(buffer)
-        reportlab.rl_config.TTFSearchPath.append(str(BASE_DIR) + '/static')
-        pdfmetrics.registerFont(TTFont('FreeSans-LrmZ', 'FreeSans-LrmZ.ttf'))
-        p.setFont('FreeSans-LrmZ', 16)
-        x = 774
-        for ingredient in ingredients_unique_list:
-            p.drawString(
-                72,
-                x,
-                f"- {ingredient['name']} - {ingredient['amount']}"
-            )
-            x -= 18
-        p.showPage()
-        p.save()
-        buffer.seek(0)
-        return FileResponse(
-            buffer,
-            as_attachment=True,
-            filename='shopping_cart.pdf'
+
+
+class MetricsView(APIView):
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        return HttpResponse(
+            render_metrics(),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
         )
@@ -0,0 +1,105 @@
+import os
+import threading
+
+import psycopg2.extras
+from django.conf import settings
+from psycopg2 import pool
+
+from foodgram.postgresql import base
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class BlockingConnectionPool(pool.ThreadedConnectionPool):
+    """Thread-safe pool whose checkout waits for a connection to be free."""
+
+    def __init__(self, minconn, maxconn, timeout, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(maxconn)
+
+    def getconn(self, key=None):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise psycopg2.OperationalError(
+                'Нет свободных соединений в пуле'
+            )
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._slots.release()
+
+
+def get_pool(alias, conn_params):
+    key = (alias, os.getpid())
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = BlockingConnectionPool(
+                settings.DB_POOL_MIN_SIZE,
+                settings.DB_POOL_MAX_SIZE,
+                settings.DB_POOL_TIMEOUT,
+                **conn_params
+            )
+        return _pools[key]
+
+
+def close_pools():
+    with _pools_lock:
+        for connection_pool in _pools.values():
+            connection_pool.closeall()
+        _pools.clear()
+
+
+def is_alive(connection):
+    if connection.closed:
+        return False
+    if not settings.DB_HEALTH_CHECKS:
+        return True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        connection.rollback()
+    except psycopg2.Error:
+        return False
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend that borrows connections from a process pool."""
+
+    def get_connection(self):
+        for _ in range(settings.DB_POOL_MAX_SIZE + 1):
+            connection = self.pool.getconn()
+            if is_alive(connection):
+                return connection
+            self.pool.putconn(connection, close=True)
+        raise psycopg2.OperationalError(
+            'Не удалось получить рабочее соединение из пула'
+        )
+
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(self.alias, conn_params)
+        connection = self.get_connection()
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda value: value
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.putconn(
+                    self.connection, close=self.errors_occurred
+                )
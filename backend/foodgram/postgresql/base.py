@@ -0,0 +1,14 @@
+from django.db.backends.postgresql import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend that checks a reused connection on first use."""
+
+    health_check_pending = False
+
+    def ensure_connection(self):
+        if self.health_check_pending:
+            self.health_check_pending = False
+            if self.connection is not None and not self.is_usable():
+                self.close()
+        super().ensure_connection()
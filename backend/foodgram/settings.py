@@ -50,6 +50,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,7 +60,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'foodgram.urls'
+ROOT_URLCONF = config('ROOT_URLCONF', default='foodgram.urls')
 
 TEMPLATES = [
     {
@@ -91,9 +92,28 @@ DATABASES = {
         'PASSWORD': config('POSTGRES_PASSWORD', default='postgres'),
         'HOST': config('DB_HOST', default='db'),
         'PORT': config('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
     }
 }
 
+# none - новое соединение на каждый запрос, persistent - постоянные
+# соединения, pool - пул соединений в процессе, pgbouncer - профиль для
+# PgBouncer в режиме transaction pooling.
+DB_POOL_MODE = config('DB_POOL_MODE', default='persistent')
+DB_POOL_MIN_SIZE = config('DB_POOL_MIN_SIZE', default=1, cast=int)
+DB_POOL_MAX_SIZE = config('DB_POOL_MAX_SIZE', default=10, cast=int)
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', default=10, cast=float)
+DB_HEALTH_CHECKS = config('DB_HEALTH_CHECKS', default=True, cast=bool)
+
+if DB_POOL_MODE in ('none', 'pool'):
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+if DB_POOL_MODE == 'pool':
+    DATABASES['default']['ENGINE'] = 'foodgram.pooled_postgresql'
+elif DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default']['ENGINE'] = 'foodgram.postgresql'
+if DB_POOL_MODE == 'pgbouncer':
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
 # DATABASES = {
 #      'default': {
 #         'ENGINE': 'django.db.backends.sqlite3',
@@ -102,6 +122,25 @@ DATABASES = {
 # }
 
 
+# Версии кэша меняются в воркерах и командах управления, поэтому кэш должен
+# быть общим для всех процессов: файловый по умолчанию или Redis/Memcached.
+CACHES = {
+    'default': {
+        'BACKEND': config(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': config(
+            'CACHE_LOCATION', default=os.path.join(BASE_DIR, '.cache')
+        ),
+    }
+}
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+CACHE_IS_SHARED = CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -153,7 +192,7 @@ AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',),
@@ -162,6 +201,50 @@ REST_FRAMEWORK = {
         'PAGE_SIZE': 6,
 }
 
+INGREDIENT_SEARCH_INDEX = config(
+    'INGREDIENT_SEARCH_INDEX', default=True, cast=bool
+)
+INGREDIENT_SEARCH_INDEX_TTL = config(
+    'INGREDIENT_SEARCH_INDEX_TTL', default=300, cast=int
+)
+
+SHOPPING_LIST_EXPORTERS = [
+    'api.exporters.PDFExporter',
+    'api.exporters.TextExporter',
+    'api.exporters.CSVExporter',
+    'api.exporters.JSONExporter',
+]
+
+REFERENCE_CACHE_TIMEOUT = config(
+    'REFERENCE_CACHE_TIMEOUT',
+    default=24 * 60 * 60 if CACHE_IS_SHARED else 5 * 60,
+    cast=int
+)
+REFERENCE_CACHE_MAX_AGE = config(
+    'REFERENCE_CACHE_MAX_AGE', default=5 * 60, cast=int
+)
+
+SHOPPING_LIST_CACHE_TIMEOUT = config(
+    'SHOPPING_LIST_CACHE_TIMEOUT',
+    default=60 * 60 if CACHE_IS_SHARED else 5 * 60,
+    cast=int
+)
+SHOPPING_LIST_CACHE_MAX_SIZE = config(
+    'SHOPPING_LIST_CACHE_MAX_SIZE', default=1024 * 1024, cast=int
+)
+
+RANKING_FAVORITE_WEIGHT = config(
+    'RANKING_FAVORITE_WEIGHT', default=1.0, cast=float
+)
+RANKING_CART_WEIGHT = config('RANKING_CART_WEIGHT', default=0.5, cast=float)
+RANKING_TRENDING_DAYS = config('RANKING_TRENDING_DAYS', default=14, cast=int)
+RANKING_TRENDING_HALF_LIFE_DAYS = config(
+    'RANKING_TRENDING_HALF_LIFE_DAYS', default=3.0, cast=float
+)
+RANKING_REFRESH_INTERVAL = config(
+    'RANKING_REFRESH_INTERVAL', default=5 * 60, cast=int
+)
+
 DJOSER = {
     'LOGIN_FIELD': 'email',
     'SERIALIZERS': {
@@ -171,3 +254,39 @@ DJOSER = {
     },
     'HIDE_USERS': False,
 }
+
+IMAGE_WORKERS = config('IMAGE_WORKERS', default=2, cast=int)
+IMAGE_WEBP_QUALITY = config('IMAGE_WEBP_QUALITY', default=80, cast=int)
+RECIPE_IMAGE_VARIANTS = {
+    'thumbnail': (144, 144),
+    'card': (720, 480),
+}
+
+IMAGE_UPLOAD_MAX_SIZE = config(
+    'IMAGE_UPLOAD_MAX_SIZE', default=10 * 1024 * 1024, cast=int
+)
+IMAGE_UPLOAD_MAX_PIXELS = config(
+    'IMAGE_UPLOAD_MAX_PIXELS', default=40 * 1000 * 1000, cast=int
+)
+IMAGE_UPLOAD_SPOOL_SIZE = config(
+    'IMAGE_UPLOAD_SPOOL_SIZE', default=1024 * 1024, cast=int
+)
+IMAGE_UPLOAD_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_SAMPLE_RATE = config('METRICS_SAMPLE_RATE', default=1.0, cast=float)
+
+ASYNC_DB_WORKERS = config('ASYNC_DB_WORKERS', default=8, cast=int)
+
+RECIPE_SEARCH_CONFIG = config('RECIPE_SEARCH_CONFIG', default='russian')
+
+RECIPE_MATCHER_INDEX = config(
+    'RECIPE_MATCHER_INDEX', default=True, cast=bool
+)
+RECIPE_MATCHER_INDEX_TTL = config(
+    'RECIPE_MATCHER_INDEX_TTL', default=300, cast=int
+)
+
+TOKEN_CACHE_SIZE = config('TOKEN_CACHE_SIZE', default=1024, cast=int)
+TOKEN_CACHE_TTL = config('TOKEN_CACHE_TTL', default=60, cast=int)
+TOKEN_CACHE_SHARED = config('TOKEN_CACHE_SHARED', default=False, cast=bool)
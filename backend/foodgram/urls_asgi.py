@@ -0,0 +1,18 @@
+from django.urls import path
+
+from api.async_views import async_view
+from api.urls import router
+
+from .urls import urlpatterns as sync_urlpatterns
+
+views = {pattern.name: pattern.callback for pattern in router.urls}
+
+urlpatterns = [
+    path('api/tags/', async_view(views['tag-list'])),
+    path('api/ingredients/', async_view(views['ingredient-list'])),
+    path('api/recipes/<int:pk>/', async_view(views['recipes-detail'])),
+    path(
+        'api/recipes/download_shopping_cart/',
+        async_view(views['recipes-download-shopping-cart'])
+    ),
+] + sync_urlpatterns
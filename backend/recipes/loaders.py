@@ -0,0 +1,128 @@
+import csv
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from .signals import bulk_loaded
+
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_json_array(file):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    for chunk in iter(lambda: file.read(CHUNK_SIZE), ''):
+        buffer += chunk
+        while True:
+            buffer = buffer.lstrip()
+            if not buffer:
+                break
+            if not started:
+                if buffer[0] != '[':
+                    raise CommandError('JSON-файл должен содержать массив')
+                buffer = buffer[1:]
+                started = True
+            elif buffer[0] == ',':
+                buffer = buffer[1:]
+            elif buffer[0] == ']':
+                return
+            else:
+                try:
+                    item, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError:
+                    break
+                buffer = buffer[end:]
+                yield item.get('fields', item)
+    if buffer.strip():
+        raise CommandError('Некорректный JSON-файл')
+
+
+def iter_csv(file, fields):
+    for row in csv.reader(file):
+        if not row or row[:len(fields)] == list(fields):
+            continue
+        yield dict(zip(fields, row))
+
+
+def read_rows(path, fields):
+    path = Path(path)
+    if path.suffix not in ('.csv', '.json'):
+        raise CommandError('Поддерживаются только файлы .csv и .json')
+    with open(path, encoding='utf-8', newline='') as file:
+        if path.suffix == '.csv':
+            yield from iter_csv(file, fields)
+        else:
+            yield from iter_json_array(file)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class BulkLoadCommand(BaseCommand):
+    """Streams rows from a CSV/JSON file into the database in batches."""
+
+    model = None
+    fields = ()
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу .csv или .json')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество строк в одной вставке'
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help='Обновлять уже существующие записи'
+        )
+
+    def clean_row(self, row):
+        raise NotImplementedError
+
+    def load_batch(self, rows, upsert):
+        raise NotImplementedError
+
+    def iter_clean_rows(self, path):
+        seen = set()
+        for row in read_rows(path, self.fields):
+            try:
+                key, values = self.clean_row(row)
+            except (AttributeError, KeyError, TypeError, ValueError):
+                self.skipped += 1
+                continue
+            if key in seen:
+                self.skipped += 1
+                continue
+            seen.add(key)
+            yield key, values
+
+    def handle(self, *args, **options):
+        self.skipped = 0
+        total = 0
+        start = time.perf_counter()
+        for batch in batched(
+            self.iter_clean_rows(options['path']), options['batch_size']
+        ):
+            with transaction.atomic():
+                self.load_batch(dict(batch), options['upsert'])
+            total += len(batch)
+        bulk_loaded.send(sender=self.model)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано строк: {total}, пропущено: {self.skipped}, '
+            f'время: {elapsed:.2f} с, '
+            f'скорость: {total / elapsed if elapsed else 0:.0f} строк/с'
+        ))
@@ -0,0 +1,28 @@
+from recipes.loaders import BulkLoadCommand
+from recipes.models import Ingredient
+
+
+class Command(BulkLoadCommand):
+    help = 'Загружает ингредиенты из CSV- или JSON-файла'
+    model = Ingredient
+    fields = ('name', 'measurement_unit')
+
+    def clean_row(self, row):
+        name = row['name'].strip()
+        measurement_unit = row['measurement_unit'].strip()
+        if not name or not measurement_unit:
+            raise ValueError
+        return (name, measurement_unit), {}
+
+    def load_batch(self, rows, upsert):
+        if upsert:
+            existing = set(Ingredient.objects.filter(
+                name__in={name for name, _ in rows}
+            ).values_list('name', 'measurement_unit'))
+            rows = {key: values for key, values in rows.items()
+                    if key not in existing}
+        Ingredient.objects.bulk_create(
+            (Ingredient(name=name, measurement_unit=measurement_unit)
+             for name, measurement_unit in rows),
+            ignore_conflicts=True
+        )
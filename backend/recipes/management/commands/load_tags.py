@@ -0,0 +1,31 @@
+from recipes.loaders import BulkLoadCommand
+from recipes.models import Tag
+
+
+class Command(BulkLoadCommand):
+    help = 'Загружает теги из CSV- или JSON-файла'
+    model = Tag
+    fields = ('name', 'color', 'slug')
+
+    def clean_row(self, row):
+        slug = row['slug'].strip()
+        if not slug:
+            raise ValueError
+        return slug, {
+            'name': row['name'].strip(),
+            'color': row.get('color', '#000000').strip(),
+        }
+
+    def load_batch(self, rows, upsert):
+        if upsert:
+            existing = Tag.objects.in_bulk(rows, field_name='slug')
+            for slug, tag in existing.items():
+                tag.name = rows[slug]['name']
+                tag.color = rows[slug]['color']
+            Tag.objects.bulk_update(existing.values(), ['name', 'color'])
+            rows = {slug: values for slug, values in rows.items()
+                    if slug not in existing}
+        Tag.objects.bulk_create(
+            (Tag(slug=slug, **values) for slug, values in rows.items()),
+            ignore_conflicts=True
+        )
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.9 on 2026-10-18 17:13
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_favorites(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Favorite = apps.get_model('recipes', 'Favorite')
+    Recipe.objects.update(favorites_count=Coalesce(
+        Subquery(
+            Favorite.objects.filter(recipe=OuterRef('pk')).order_by().values(
+                'recipe'
+            ).annotate(count=Count('pk')).values('count')
+        ),
+        Value(0)
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_ingredient_name_trigram_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(count_favorites, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_ingredients(apps, schema_editor):
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    duplicates = Ingredient.objects.values(
+        'name', 'measurement_unit'
+    ).annotate(keep_id=Min('id'), total=Count('id')).filter(total__gt=1)
+    for duplicate in duplicates:
+        duplicate_ids = list(Ingredient.objects.filter(
+            name=duplicate['name'],
+            measurement_unit=duplicate['measurement_unit']
+        ).exclude(id=duplicate['keep_id']).values_list('id', flat=True))
+        for item in RecipeIngredient.objects.filter(
+            ingredient_id__in=duplicate_ids
+        ):
+            kept = RecipeIngredient.objects.filter(
+                recipe_id=item.recipe_id,
+                ingredient_id=duplicate['keep_id']
+            ).first()
+            if kept is None:
+                item.ingredient_id = duplicate['keep_id']
+                item.save(update_fields=['ingredient'])
+            else:
+                kept.amount += item.amount
+                kept.save(update_fields=['amount'])
+                item.delete()
+        Ingredient.objects.filter(id__in=duplicate_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipe_scores'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_ingredients, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(
+                fields=('name', 'measurement_unit'),
+                name='unique_ingredient'
+            ),
+        ),
+    ]
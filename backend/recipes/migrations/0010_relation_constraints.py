@@ -0,0 +1,104 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def get_duplicates(model, fields, **aggregates):
+    return model.objects.values(*fields).annotate(
+        keep_id=Min('id'), total=Count('id'), **aggregates
+    ).filter(total__gt=1)
+
+
+def delete_duplicates(model, fields, duplicate):
+    model.objects.filter(
+        **{field: duplicate[field] for field in fields}
+    ).exclude(id=duplicate['keep_id']).delete()
+
+
+def remove_duplicate_relations(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Favorite = apps.get_model('recipes', 'Favorite')
+    ShoppingCart = apps.get_model('recipes', 'ShoppingCart')
+    RecipeTag = apps.get_model('recipes', 'RecipeTag')
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    for model, fields in (
+        (Favorite, ('user', 'recipe')),
+        (ShoppingCart, ('user', 'recipe')),
+        (RecipeTag, ('recipe', 'tag')),
+    ):
+        for duplicate in get_duplicates(model, fields):
+            delete_duplicates(model, fields, duplicate)
+            if model is Favorite:
+                Recipe.objects.filter(pk=duplicate['recipe']).update(
+                    favorites_count=Favorite.objects.filter(
+                        recipe_id=duplicate['recipe']
+                    ).count()
+                )
+    fields = ('recipe', 'ingredient')
+    for duplicate in get_duplicates(
+        RecipeIngredient, fields, total_amount=Sum('amount')
+    ):
+        delete_duplicates(RecipeIngredient, fields, duplicate)
+        RecipeIngredient.objects.filter(pk=duplicate['keep_id']).update(
+            amount=duplicate['total_amount']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0009_recipe_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_relations, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='favorite',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'recipe'), name='unique_favorite'
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='shoppingcart',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'recipe'), name='unique_shopping_cart'
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='recipetag',
+            constraint=models.UniqueConstraint(
+                fields=('recipe', 'tag'), name='unique_recipe_tag'
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='recipeingredient',
+            constraint=models.UniqueConstraint(
+                fields=('recipe', 'ingredient'),
+                name='unique_recipe_ingredient'
+            ),
+        ),
+        migrations.AlterField(
+            model_name='favorite',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='favorite', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='shoppingcart',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='shopping_cart', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='recipetag',
+            name='recipe',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='recipes.recipe'),
+        ),
+        migrations.AlterField(
+            model_name='recipeingredient',
+            name='recipe',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='recipes.recipe'),
+        ),
+    ]
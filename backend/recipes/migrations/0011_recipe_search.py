@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.db import migrations
+
+INGREDIENT_NAMES = '''coalesce((
+    SELECT {aggregate}
+    FROM recipes_recipeingredient AS item
+    JOIN recipes_ingredient AS ingredient
+        ON ingredient.id = item.ingredient_id
+    WHERE item.recipe_id = recipe.id
+), '')'''
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'ALTER TABLE recipes_recipe '
+            'ADD COLUMN IF NOT EXISTS search_vector tsvector'
+        )
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS recipes_recipe_search_vector '
+            'ON recipes_recipe USING gin (search_vector)'
+        )
+        names = INGREDIENT_NAMES.format(
+            aggregate="string_agg(ingredient.name, ' ')"
+        )
+        schema_editor.execute(
+            'UPDATE recipes_recipe AS recipe SET search_vector = '
+            "setweight(to_tsvector(%(config)s::regconfig, recipe.name), 'A')"
+            f' || setweight(to_tsvector(%(config)s::regconfig, {names}), '
+            "'B') || setweight(to_tsvector(%(config)s::regconfig, "
+            "recipe.text), 'C')",
+            {'config': settings.RECIPE_SEARCH_CONFIG}
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE IF NOT EXISTS recipes_recipe_search '
+            'USING fts5(name, ingredients, text, '
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        names = INGREDIENT_NAMES.format(
+            aggregate="group_concat(ingredient.name, ' ')"
+        )
+        schema_editor.execute(
+            'INSERT INTO recipes_recipe_search '
+            '(rowid, name, ingredients, text) '
+            f'SELECT recipe.id, recipe.name, {names}, recipe.text '
+            'FROM recipes_recipe AS recipe'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'DROP INDEX IF EXISTS recipes_recipe_search_vector'
+        )
+        schema_editor.execute(
+            'ALTER TABLE recipes_recipe DROP COLUMN IF EXISTS search_vector'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS recipes_recipe_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_relation_constraints'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.9 on 2026-10-18 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_recipe_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipescore',
+            name='dirty',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='recipescore',
+            index=models.Index(condition=models.Q(('dirty', True)), fields=['recipe'], name='recipe_score_dirty'),
+        ),
+    ]
@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.core.validators import MinValueValidator
 from django.db import models
 
-from users.models import User
+from users.models import ManagedFieldsMixin, User
 
 
 class Tag(models.Model):
@@ -18,11 +18,19 @@ class Ingredient(models.Model):
     name = models.CharField(max_length=200, db_index=True)
     measurement_unit = models.CharField(max_length=200)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name', 'measurement_unit'],
+                name='unique_ingredient'
+            )
+        ]
+
     def __str__(self):
         return self.name
 
 
-class Recipe(models.Model):
+class Recipe(ManagedFieldsMixin, models.Model):
     tags = models.ManyToManyField(
         Tag,
         related_name='recipe_tags',
@@ -40,6 +48,7 @@ class Recipe(models.Model):
     )
     name = models.CharField(max_length=200)
     image = models.ImageField(upload_to='recipes/images/')
+    image_variants = models.JSONField(default=dict, editable=False)
     text = models.TextField()
     cooking_time = models.PositiveSmallIntegerField(
         default=1,
@@ -47,25 +56,48 @@ class Recipe(models.Model):
                     message='Время приготовления должно быть больше 0')]
     )
     publication_date = models.DateTimeField(auto_now_add=True, db_index=True)
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        db_index=True
+    )
+
+    managed_fields = ('favorites_count', 'image_variants')
 
     class Meta:
         ordering = ('-publication_date',)
 
-    @admin.display(description='In favorite')
+    @admin.display(description='In favorite', ordering='favorites_count')
     def in_favorite_count(self):
-        return Favorite.objects.filter(recipe_id=self.id).count()
+        return self.favorites_count
 
     def __str__(self):
         return self.name
 
 
 class RecipeTag(models.Model):
-    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE)
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        db_index=False
+    )
     tag = models.ForeignKey(Tag, on_delete=models.PROTECT)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipe', 'tag'],
+                name='unique_recipe_tag'
+            )
+        ]
+
 
 class RecipeIngredient(models.Model):
-    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE)
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        db_index=False
+    )
     ingredient = models.ForeignKey(Ingredient, on_delete=models.PROTECT)
     amount = models.PositiveSmallIntegerField(
         default=1,
@@ -73,40 +105,78 @@ class RecipeIngredient(models.Model):
                     message='Количество ингредиента должно быть больше 0')]
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipe', 'ingredient'],
+                name='unique_recipe_ingredient'
+            )
+        ]
+
 
 class Favorite(models.Model):
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='favorite'
+        related_name='favorite',
+        db_index=False
     )
     recipe = models.ForeignKey(
         Recipe,
         on_delete=models.CASCADE,
         related_name='in_favorite'
     )
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
-        models.UniqueConstraint(
-            fields=['user', 'recipe'],
-            name='unique_recipe'
-        )
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipe'],
+                name='unique_favorite'
+            )
+        ]
 
 
 class ShoppingCart(models.Model):
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='shopping_cart'
+        related_name='shopping_cart',
+        db_index=False
     )
     recipe = models.ForeignKey(
         Recipe,
         on_delete=models.CASCADE,
         related_name='in_shopping_cart'
     )
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipe'],
+                name='unique_shopping_cart'
+            )
+        ]
+
+
+class RecipeScore(models.Model):
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score'
+    )
+    popular = models.FloatField(default=0, db_index=True)
+    trending = models.FloatField(default=0, db_index=True)
+    updated = models.DateTimeField(auto_now=True)
+    dirty = models.BooleanField(default=False)
 
     class Meta:
-        models.UniqueConstraint(
-            fields=['user', 'recipe'],
-            name='unique_recipe'
-        )
+        indexes = [
+            models.Index(
+                fields=['recipe'],
+                condition=models.Q(dirty=True),
+                name='recipe_score_dirty'
+            )
+        ]
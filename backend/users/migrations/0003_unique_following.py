@@ -0,0 +1,45 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_follows(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    Follow = apps.get_model('users', 'Follow')
+    duplicates = Follow.objects.values('user', 'author').annotate(
+        keep_id=Min('id'), total=Count('id')
+    ).filter(total__gt=1)
+    for duplicate in duplicates:
+        Follow.objects.filter(
+            user_id=duplicate['user'], author_id=duplicate['author']
+        ).exclude(id=duplicate['keep_id']).delete()
+        User.objects.filter(pk=duplicate['author']).update(
+            followers_count=Follow.objects.filter(
+                author_id=duplicate['author']
+            ).count()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_follows, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'author'), name='unique_following'
+            ),
+        ),
+        migrations.AlterField(
+            model_name='follow',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='follower', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -2,10 +2,32 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 
 
-class User(AbstractUser):
+class ManagedFieldsMixin:
+    """Keeps fields maintained by queries out of ordinary full-row saves."""
+
+    managed_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (not args and not self._state.adding
+                and kwargs.get('update_fields') is None
+                and not kwargs.get('force_insert')):
+            skipped = {*self.managed_fields, *self.get_deferred_fields()}
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped
+                and field.name not in skipped
+            ]
+        super().save(*args, **kwargs)
+
+
+class User(ManagedFieldsMixin, AbstractUser):
     first_name = models.CharField('first name', max_length=150)
     last_name = models.CharField('last name', max_length=150)
     email = models.EmailField('email address')
+    recipes_count = models.PositiveIntegerField(default=0, editable=False)
+    followers_count = models.PositiveIntegerField(default=0, editable=False)
+
+    managed_fields = ('recipes_count', 'followers_count')
 
     def __str__(self):
         return self.username
@@ -15,7 +37,8 @@ class Follow(models.Model):
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        related_name='follower'
+        related_name='follower',
+        db_index=False
     )
     author = models.ForeignKey(
         User,
@@ -24,7 +47,9 @@ class Follow(models.Model):
     )
 
     class Meta:
-        models.UniqueConstraint(
-            fields=['user', 'author'],
-            name='unique_following'
-        )
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'],
+                name='unique_following'
+            )
+        ]